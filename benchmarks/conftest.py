@@ -0,0 +1,187 @@
+import io
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+
+@pytest.fixture(autouse=True)
+def enable_debug_false():
+    with override_settings(DEBUG=False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_posts(django_db_blocker):
+    """Создаёт n опубликованных постов одной пачкой через bulk_create."""
+    from blog.models import Category, Post
+
+    def make(n):
+        User = get_user_model()
+        author = User.objects.create(username=f'bench_{n}')
+        category = Category.objects.create(
+            title='bench', description='bench', slug=f'bench-{n}'
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            (
+                Post(
+                    title=f'Пост {i}',
+                    text='Текст публикации. ' * 20,
+                    pub_date=now - timedelta(minutes=i),
+                    author=author,
+                    category=category,
+                )
+                for i in range(n)
+            ),
+            batch_size=5000,
+        )
+        return author, category
+
+    return make
+
+
+DEFAULT_SIZES = '1000'
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+# Запас на шум таймера для быстрых страниц.
+LATENCY_SLACK_MS = 1.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption(
+        '--bench-sizes', default=DEFAULT_SIZES,
+        help='Размеры наборов данных через запятую, например 1000,100000.',
+    )
+    group.addoption('--bench-repeats', type=int, default=50)
+    group.addoption('--bench-baseline', default=str(DEFAULT_BASELINE))
+    group.addoption(
+        '--bench-threshold', type=float, default=1.25,
+        help='Во сколько раз метрика может превысить базовую.',
+    )
+    group.addoption(
+        '--bench-update', action='store_true',
+        help='Перезаписать базовые значения результатами прогона.',
+    )
+    group.addoption(
+        '--bench-latency', action='store_true',
+        help='Сравнивать и время ответа; база должна быть записана на'
+             ' этой же машине через --bench-update.',
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'dataset_size' in metafunc.fixturenames:
+        sizes = sorted(
+            int(size)
+            for size in metafunc.config.getoption('bench_sizes').split(',')
+        )
+        # Область session группирует тесты по размеру: данные
+        # догенерируются один раз при переходе к следующему размеру.
+        metafunc.parametrize(
+            'dataset_size', sizes, scope='session',
+            ids=[f'{size}posts' for size in sizes],
+        )
+
+
+class Baseline:
+    """Базовые метрики в JSON: {размер: {сценарий: метрики}}.
+
+    Число запросов и размер ответа от машины не зависят и проверяются
+    всегда. Время ответа записано на одной машине, поэтому сравнивается
+    только при ``latency``.
+    """
+
+    def __init__(self, path, threshold, update, latency=False):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.update = update
+        self.latency = latency
+        self.data = (
+            json.loads(self.path.read_text(encoding='utf-8'))
+            if self.path.exists() else {}
+        )
+        self.changed = False
+
+    def check(self, size, name, result):
+        """Сравнить с базой и вернуть список регрессий.
+
+        Новые сценарии и результаты при --bench-update записываются.
+        """
+        runs = self.data.setdefault(str(size), {})
+        base = runs.get(name)
+        if base is None or self.update:
+            runs[name] = result
+            self.changed = True
+            return []
+        regressions = []
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'queries {base["queries"]} -> {result["queries"]}'
+            )
+        metrics = [('bytes', 0)]
+        if self.latency:
+            metrics += [
+                ('p50_ms', LATENCY_SLACK_MS), ('p95_ms', LATENCY_SLACK_MS),
+            ]
+        for metric, slack in metrics:
+            if result[metric] > base[metric] * self.threshold + slack:
+                regressions.append(
+                    f'{metric} {base[metric]} -> {result[metric]}'
+                )
+        return regressions
+
+    def save(self):
+        if self.changed:
+            self.path.write_text(
+                json.dumps(self.data, indent=2, sort_keys=True) + '\n',
+                encoding='utf-8',
+            )
+
+
+@pytest.fixture(scope='session')
+def baseline(request):
+    config = request.config
+    baseline = Baseline(
+        config.getoption('bench_baseline'),
+        config.getoption('bench_threshold'),
+        config.getoption('bench_update'),
+        config.getoption('bench_latency'),
+    )
+    yield baseline
+    baseline.save()
+
+
+@pytest.fixture(scope='session')
+def dataset(dataset_size, django_db_setup, django_db_blocker):
+    """Набор generate_blog_data из dataset_size постов.
+
+    Данные переживают тесты и при переходе к большему размеру
+    догенерируются до нужного числа постов.
+    """
+    from blog.models import Post
+
+    with django_db_blocker.unblock():
+        missing = dataset_size - Post.objects.count()
+        if missing > 0:
+            call_command(
+                'generate_blog_data', '--seed', str(dataset_size),
+                '--posts', str(missing), '--comments', str(missing * 3),
+                '--users', str(max(missing // 50, 10)),
+                stdout=io.StringIO(),
+            )
+    return dataset_size
@@ -0,0 +1,52 @@
+import random
+import statistics
+import sys
+import time
+
+from core.autocomplete import PrefixIndex
+
+TITLES = 1_000_000
+QUERIES = 2_000
+MAX_LATENCY = 0.001
+WORDS = (
+    'лес', 'река', 'город', 'прогулка', 'зима', 'лето', 'кот', 'дорога',
+    'поход', 'горы', 'море', 'книга', 'кофе', 'вечер', 'утро', 'поезд',
+)
+
+
+def make_titles(n, seed=1):
+    rng = random.Random(seed)
+    for pk in range(n):
+        words = rng.choices(WORDS, k=rng.randint(2, 5))
+        yield 'post', pk, f'{" ".join(words).capitalize()} {pk}', None
+
+
+def test_autocomplete_latency_at_1m_titles():
+    """Подсказка по индексу из 1M заголовков быстрее миллисекунды."""
+    start = time.perf_counter()
+    index = PrefixIndex(max_entries=10_000_000)
+    index.load(make_titles(TITLES))
+    built = time.perf_counter() - start
+    memory = sys.getsizeof(index.entries) + sum(
+        map(sys.getsizeof, index.entries)
+    )
+    rng = random.Random(2)
+    timings = []
+    for _ in range(QUERIES):
+        word = rng.choice(WORDS)
+        prefix = word[:rng.randint(1, len(word))]
+        start = time.perf_counter()
+        index.search(prefix, 10)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99)]
+    start = time.perf_counter()
+    index.add('post', TITLES, 'Новый пост про лес', None)
+    insert = time.perf_counter() - start
+    print(
+        f'{len(index.entries)} keys, built in {built:.1f} s, '
+        f'{memory / 2 ** 20:.0f} MiB of keys; search p50 {p50 * 1e6:.0f} us, '
+        f'p99 {p99 * 1e6:.0f} us; insert {insert * 1e3:.2f} ms'
+    )
+    assert p99 < MAX_LATENCY
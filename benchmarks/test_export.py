@@ -0,0 +1,35 @@
+import time
+import tracemalloc
+
+import pytest
+
+from blog.models import Post
+from core.export import iter_export
+
+pytestmark = [pytest.mark.django_db]
+
+SIZES = (10_000, 100_000)
+MAX_GROWTH = 1.5
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'jsonl'])
+def test_export_memory_is_flat(make_posts, export_format):
+    """Пик памяти выгрузки не растёт вместе с таблицей."""
+    results = {}
+    total = 0
+    for size in SIZES:
+        make_posts(size - total)
+        total = size
+        tracemalloc.start()
+        start = time.perf_counter()
+        written = sum(
+            len(block)
+            for block in iter_export(Post.objects.all(), export_format)
+        )
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[size] = peak
+        print(f'{size:>8} posts: {written / 2 ** 20:6.1f} MiB written, '
+              f'peak {peak / 2 ** 20:5.1f} MiB, {size / elapsed:8.0f} rows/s')
+    assert max(results.values()) / min(results.values()) < MAX_GROWTH
@@ -0,0 +1,52 @@
+import io
+import json
+import tracemalloc
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+SIZES = (10_000, 50_000)
+MAX_GROWTH = 1.5
+
+
+def write_fixture(path, n, author, category, offset):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('[\n')
+        for i in range(offset, offset + n):
+            if i > offset:
+                file.write(',\n')
+            json.dump({'model': 'blog.post', 'pk': i + 1, 'fields': {
+                'title': f'Пост {i}', 'text': 'Текст публикации. ' * 20,
+                'author': author.pk, 'category': category.pk,
+                'pub_date': '2024-01-01T00:00:00Z', 'is_published': True,
+                'created_at': '2024-01-01T00:00:00Z',
+            }}, file, ensure_ascii=False)
+        file.write('\n]\n')
+
+
+def test_import_memory_is_flat(tmp_path):
+    """Пик памяти загрузки не растёт вместе с размером файла."""
+    author = get_user_model().objects.create(username='bench')
+    category = Category.objects.create(
+        title='bench', description='bench', slug='bench'
+    )
+    peaks = {}
+    offset = 0
+    for size in SIZES:
+        path = tmp_path / f'posts_{size}.json'
+        write_fixture(path, size, author, category, offset)
+        offset += size
+        out = io.StringIO()
+        tracemalloc.start()
+        call_command('import_blog', str(path), stdout=out)
+        peaks[size] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'{size:>8} posts: peak {peaks[size] / 2 ** 20:5.1f} MiB; '
+              f'{out.getvalue().splitlines()[-1]}')
+    assert Post.objects.count() == sum(SIZES)
+    assert max(peaks.values()) / min(peaks.values()) < MAX_GROWTH
@@ -0,0 +1,69 @@
+import statistics
+import time
+
+import pytest
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.models import Post
+from core.paginators import KeysetPage, KeysetPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+SIZES = (1_000, 10_000, 100_000)
+RENDER_SIZES = (1_000, 100_000, 10_000_000)
+REPEATS = 5
+MAX_GROWTH = 1.2
+
+
+class FixedCount:
+    def __init__(self, count):
+        self.value = count
+
+    def count(self):
+        return self.value
+
+
+def median_time(func):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def test_paginator_render_is_flat():
+    """Размер и время рендера пагинатора не зависят от числа постов."""
+    posts = [Post(pk=i, pub_date=timezone.now()) for i in range(10)]
+    results = {}
+    for size in RENDER_SIZES:
+        paginator = KeysetPaginator(
+            Post.objects.all(), 10, count_provider=FixedCount(size)
+        )
+        page = KeysetPage(posts, paginator.num_pages // 2, paginator)
+        html, elapsed = median_time(lambda: render_to_string(
+            'includes/paginator.html', {'page_obj': page}
+        ))
+        results[size] = (len(html), elapsed)
+        print(f'{size:>10} posts: {len(html):>6} bytes, '
+              f'{elapsed * 1000:6.2f} ms')
+    lengths = [length for length, _ in results.values()]
+    timings = [elapsed for _, elapsed in results.values()]
+    assert max(lengths) / min(lengths) < MAX_GROWTH
+    assert max(timings) / min(timings) < 3
+
+
+def test_index_response_size_is_flat(client, make_posts):
+    """Размер ответа главной страницы не растёт с числом постов."""
+    results = {}
+    total = 0
+    for size in SIZES:
+        make_posts(size - total)
+        total = size
+        response, elapsed = median_time(lambda: client.get('/?page=2'))
+        assert response.status_code == 200
+        results[size] = len(response.content)
+        print(f'{size:>8} posts: {results[size]:>7} bytes, '
+              f'{elapsed * 1000:7.1f} ms')
+    assert max(results.values()) / min(results.values()) < MAX_GROWTH
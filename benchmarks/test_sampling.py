@@ -0,0 +1,62 @@
+import statistics
+import sys
+import threading
+import time
+
+import pytest
+from django.test import override_settings
+
+from core.profiling import (
+    stack_key, start_sampling_profiler, stop_sampling_profiler,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+ROUNDS = 10
+REQUESTS = 50
+INTERVAL = 0.01
+MAX_OVERHEAD = 0.05
+
+
+def request_times(client, url):
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        client.get(url)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def test_sampling_profiler_overhead(client, make_posts):
+    """Фоновый профайлер на 100 Гц занимает не больше 5% потока.
+
+    Проверяется цена одного сэмпла относительно интервала: она от шума
+    машины почти не зависит. Замедление запросов только печатается —
+    медиана по раундам, где замеры с профайлером и без чередуются.
+    """
+    make_posts(1000)
+    request_times(client, '/')
+    overheads = []
+    for _ in range(ROUNDS):
+        plain = request_times(client, '/')
+        with override_settings(SAMPLING_PROFILER_INTERVAL=INTERVAL):
+            sampler = start_sampling_profiler()
+        try:
+            sampled = request_times(client, '/')
+        finally:
+            stop_sampling_profiler()
+        overheads.append(
+            statistics.median(sampled) / statistics.median(plain) - 1
+        )
+    assert sampler.stacks
+
+    # Цена одного сэмпла: снимок кадров и свёртка стека этого потока.
+    ident = threading.get_ident()
+    start = time.perf_counter()
+    for _ in range(1000):
+        sampler.add(stack_key(sys._current_frames()[ident]))
+    cost = (time.perf_counter() - start) / 1000
+    print(f'requests {statistics.median(overheads):+.1%} '
+          f'(rounds {min(overheads):+.1%}..{max(overheads):+.1%}); '
+          f'sample {cost * 1e6:.0f} us = {cost / INTERVAL:.2%} of a thread')
+    assert cost / INTERVAL < MAX_OVERHEAD
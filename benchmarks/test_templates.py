@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+from core.warmup import iter_template_names
+
+REPEATS = 5
+
+
+def make_engine():
+    """Движок с кеширующим загрузчиком, как в продакшен-профиле."""
+    return DjangoTemplates({
+        'NAME': 'benchmark',
+        'DIRS': settings.TEMPLATES[0]['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )]},
+    })
+
+
+def load_all(engine, names):
+    start = time.perf_counter()
+    for name in names:
+        engine.get_template(name)
+    return time.perf_counter() - start
+
+
+def test_cold_vs_warm_templates():
+    """Первое обращение к шаблонам против обращения после прогрева."""
+    names = list(iter_template_names(settings.TEMPLATES[0]['DIRS'][0]))
+    cold, warm = [], []
+    for _ in range(REPEATS):
+        engine = make_engine()
+        cold.append(load_all(engine, names))
+        warm.append(load_all(engine, names))
+    cold_ms, warm_ms = min(cold) * 1000, min(warm) * 1000
+    print(f'{len(names)} templates: cold {cold_ms:.2f} ms, '
+          f'warm {warm_ms:.2f} ms')
+    assert warm_ms * 5 < cold_ms
@@ -0,0 +1,120 @@
+import statistics
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+WARMUP = 2
+
+
+def measure(client, method, url, data_factory, repeats, status):
+    """p50/p95 времени ответа, число запросов к БД и размер ответа."""
+    timings = []
+    queries = size = 0
+    for run in range(WARMUP + repeats):
+        data = data_factory(run) if data_factory else None
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            elapsed = time.perf_counter() - start
+        assert response.status_code == status, url
+        if run < WARMUP:
+            continue
+        timings.append(elapsed)
+        queries = max(queries, len(captured))
+        size = max(size, len(response.content))
+    return {
+        'p50_ms': round(statistics.median(timings) * 1000, 2),
+        'p95_ms': round(statistics.quantiles(
+            timings, n=20, method='inclusive'
+        )[-1] * 1000, 2),
+        'queries': queries,
+        'bytes': size,
+    }
+
+
+def visible_posts():
+    return Post.objects.filter(
+        is_published=True,
+        pub_date__lte=timezone.now(),
+        category__is_published=True,
+    )
+
+
+def hot_category():
+    return Category.objects.filter(is_published=True).annotate(
+        post_total=Count('posts', filter=Q(posts__in=visible_posts()))
+    ).order_by('-post_total').first()
+
+
+def hot_author():
+    return get_user_model().objects.annotate(
+        post_total=Count('posts')
+    ).order_by('-post_total').first()
+
+
+def hot_post():
+    return visible_posts().order_by('-comment_count').first()
+
+
+def post_form(run):
+    return {
+        'title': f'Новый пост {run}',
+        'text': 'Текст публикации.',
+        'pub_date': (timezone.now() + timedelta(days=1)).strftime(
+            '%Y-%m-%dT%H:%M'
+        ),
+        'category': hot_category().pk,
+        'is_published': 'on',
+    }
+
+
+SCENARIOS = {
+    'index': lambda: ('get', reverse('blog:index'), None, 200),
+    'category_posts': lambda: ('get', reverse(
+        'blog:category_posts', args=[hot_category().slug]
+    ), None, 200),
+    'profile': lambda: ('get', reverse(
+        'blog:profile', args=[hot_author().username]
+    ), None, 200),
+    'post_detail': lambda: ('get', reverse(
+        'blog:post_detail', args=[hot_post().pk]
+    ), None, 200),
+    'add_comment': lambda: ('post', reverse(
+        'blog:add_comment', args=[hot_post().pk]
+    ), lambda run: {'text': f'Комментарий {run}'}, 302),
+    'create_post': lambda: (
+        'post', reverse('blog:create_post'), post_form, 302
+    ),
+}
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_view_budget(dataset, scenario, client, baseline, request):
+    """Время, запросы и размер ответа не хуже базовых значений.
+
+    Страницы открывает залогиненный читатель: для него кеш готовых
+    страниц не работает, и измеряется полный путь запроса.
+    """
+    reader = get_user_model().objects.create(username='bench_reader')
+    client.force_login(reader)
+    method, url, data_factory, status = SCENARIOS[scenario]()
+    result = measure(
+        client, method, url, data_factory,
+        request.config.getoption('bench_repeats'), status,
+    )
+    print(f'{dataset:>8} posts {scenario:>15}: p50 {result["p50_ms"]:7.2f} '
+          f'ms, p95 {result["p95_ms"]:7.2f} ms, {result["queries"]:>3} '
+          f'queries, {result["bytes"]:>7} bytes')
+    regressions = baseline.check(dataset, scenario, result)
+    assert not regressions, f'{scenario}: ' + ', '.join(regressions)
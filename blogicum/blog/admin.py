@@ -1,13 +1,203 @@
-from django.contrib import admin
+from functools import partial
 
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.utils import model_ngettext
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth import get_permission_codename
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.template.response import TemplateResponse
+
+from .const import ADMIN_DELETE_PREVIEW_LENGTH, ADMIN_TEXT_PREVIEW_LENGTH
 from .models import Category, Comment, Location, Post
+from core.export import export_response
+from core.services import (
+    bulk_delete_categories,
+    bulk_delete_comments,
+    bulk_delete_posts,
+    bulk_update,
+    bulk_update_posts,
+    recount_comments,
+    search_posts,
+)
+
+
+class TextPreviewChangeList(ChangeList):
+    """Список объектов без полных текстов.
+
+    Поле ``text`` отложено, его начало читается аннотацией
+    ``text_start``, а тексты связанных объектов из
+    ``list_select_related`` не загружаются вовсе. Сами поля объектов не
+    меняются: действия получают этот же queryset и могут их сохранять.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return (
+            super().get_queryset(request, exclude_parameters)
+            .defer(*self.model_admin.deferred_fields)
+            .annotate(text_start=Substr(
+                'text', 1, ADMIN_TEXT_PREVIEW_LENGTH + 1
+            ))
+        )
+
+
+class TextPreviewMixin:
+    deferred_fields = ('text',)
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return TextPreviewChangeList
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        if len(obj.text_start) > ADMIN_TEXT_PREVIEW_LENGTH:
+            return obj.text_start[:ADMIN_TEXT_PREVIEW_LENGTH] + '…'
+        return obj.text_start
+
+
+class BulkActionsMixin:
+    """Массовые действия одним UPDATE/DELETE на пачку строк.
+
+    Стандартное ``delete_selected`` загружает каждый объект со всеми
+    зависимыми, поэтому заменено удалением по пачкам. Подтверждение
+    остаётся, но показывает число удаляемых строк и начало списка, а в
+    журнал админки пишется запись на каждый выбранный объект. Вместо
+    сигналов на каждую строку функции из core.services отправляют одно
+    событие ``bulk_changed``.
+    """
+
+    bulk_delete_function = None
+    # Поле, которого хватает __str__ модели: журнал и подтверждение
+    # читают только его.
+    repr_field = None
+
+    def run_bulk_action(self, request, message, function, *args, **kwargs):
+        count = function(*args, **kwargs)
+        self.message_user(request, f'{message}: {count}')
+
+    def get_bulk_delete_counts(self, queryset):
+        """Пары (модель, число удаляемых строк), выбранные — первыми."""
+        return [(self.model, queryset.count())]
+
+    def get_lacking_permissions(self, request, counts):
+        return [
+            model._meta.verbose_name_plural
+            for model, _ in counts
+            if not request.user.has_perm(
+                f'{model._meta.app_label}.'
+                f'{get_permission_codename("delete", model._meta)}'
+            )
+        ]
+
+    def get_repr_queryset(self, pks):
+        return self.model._default_manager.filter(pk__in=pks).only(
+            self.repr_field
+        )
+
+    def log_bulk_deletions(self, request, pks):
+        self.log_deletions(request, self.get_repr_queryset(pks))
+
+    def delete_confirmation(self, request, queryset, counts, lacking):
+        pks = list(queryset.values_list('pk', flat=True))
+        preview = [
+            str(obj) for obj in self.get_repr_queryset(
+                pks[:ADMIN_DELETE_PREVIEW_LENGTH]
+            )
+        ]
+        if len(pks) > len(preview):
+            preview.append(f'… и ещё {len(pks) - len(preview)}')
+        request.current_app = self.admin_site.name
+        return TemplateResponse(
+            request,
+            'admin/delete_selected_confirmation.html',
+            {
+                **self.admin_site.each_context(request),
+                'title': 'Удаление невозможно' if lacking else 'Вы уверены?',
+                'subtitle': None,
+                'objects_name': str(model_ngettext(self.opts, len(pks))),
+                'deletable_objects': [preview],
+                'model_count': [
+                    (model._meta.verbose_name_plural, count)
+                    for model, count in counts
+                ],
+                # Шаблону нужны только ключи для скрытых полей формы.
+                'queryset': [self.model(pk=pk) for pk in pks],
+                'perms_lacking': lacking,
+                'protected': None,
+                'opts': self.opts,
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+                'media': self.media,
+            },
+        )
+
+    @admin.action(description='Удалить выбранные', permissions=['delete'])
+    def delete_selected(self, request, queryset):
+        counts = self.get_bulk_delete_counts(queryset)
+        lacking = self.get_lacking_permissions(request, counts)
+        if not request.POST.get('post') or lacking:
+            return self.delete_confirmation(
+                request, queryset, counts, lacking
+            )
+        self.run_bulk_action(
+            request, 'Удалено', self.bulk_delete_function, queryset,
+            before_delete=partial(self.log_bulk_deletions, request),
+        )
+
+
+class PublishActionsMixin(BulkActionsMixin):
+    def update_published(self, queryset, is_published):
+        return bulk_update(queryset, is_published=is_published)
+
+    @admin.action(description='Опубликовать', permissions=['change'])
+    def publish(self, request, queryset):
+        self.run_bulk_action(
+            request, 'Опубликовано', self.update_published, queryset, True
+        )
+
+    @admin.action(description='Снять с публикации', permissions=['change'])
+    def unpublish(self, request, queryset):
+        self.run_bulk_action(
+            request, 'Снято с публикации', self.update_published,
+            queryset, False,
+        )
+
+
+class ExportActionsMixin:
+    """Потоковая выгрузка выбранных объектов в CSV и JSONL."""
+
+    def export(self, queryset, export_format):
+        return export_response(
+            queryset, export_format, self.model._meta.model_name
+        )
+
+    @admin.action(description='Выгрузить в CSV', permissions=['view'])
+    def export_csv(self, request, queryset):
+        return self.export(queryset, 'csv')
+
+    @admin.action(description='Выгрузить в JSONL', permissions=['view'])
+    def export_jsonl(self, request, queryset):
+        return self.export(queryset, 'jsonl')
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, label='Категория'
+    )
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    PublishActionsMixin,
+    ExportActionsMixin,
+    TextPreviewMixin,
+    admin.ModelAdmin,
+):
     list_display = (
         'title',
-        'text',
+        'text_preview',
         'pub_date',
         'author',
         'location',
@@ -16,8 +206,58 @@ class PostAdmin(admin.ModelAdmin):
         'created_at',
     )
     list_display_links = ('title',)
-    list_filter = ('is_published',)
+    list_filter = ('is_published', 'category')
+    list_select_related = ('author', 'location', 'category')
+    autocomplete_fields = ('author', 'location', 'category')
     search_fields = ('title',)
+    action_form = PostActionForm
+    actions = (
+        'publish',
+        'unpublish',
+        'move_to_category',
+        'delete_selected',
+        'export_csv',
+        'export_jsonl',
+    )
+    bulk_delete_function = staticmethod(bulk_delete_posts)
+    repr_field = 'title'
+
+    def get_bulk_delete_counts(self, queryset):
+        return [
+            *super().get_bulk_delete_counts(queryset),
+            (Comment, Comment.objects.filter(
+                post__in=queryset.values('pk')
+            ).count()),
+        ]
+
+    def update_published(self, queryset, is_published):
+        return bulk_update_posts(queryset, is_published=is_published)
+
+    @admin.action(
+        description='Перенести в категорию', permissions=['change']
+    )
+    def move_to_category(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or not form.cleaned_data['category']:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.ERROR
+            )
+            return
+        self.run_bulk_action(
+            request, 'Перенесено', bulk_update_posts, queryset,
+            category=form.cleaned_data['category'],
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по полнотекстовому индексу вместо LIKE по заголовку.
+
+        Последнее слово ищется по началу: так работает и автодополнение
+        поста в форме комментария, где слово ещё не дописано.
+        """
+        if not search_term.strip():
+            return queryset, False
+        return search_posts(queryset, search_term, prefix=True), False
 
 
 @admin.register(Location)
@@ -32,7 +272,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'slug',
@@ -42,14 +282,42 @@ class CategoryAdmin(admin.ModelAdmin):
     )
     list_filter = ('created_at',)
     search_fields = ('title',)
+    actions = ('publish', 'unpublish', 'delete_selected')
+    bulk_delete_function = staticmethod(bulk_delete_categories)
+    repr_field = 'title'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(
+    BulkActionsMixin,
+    ExportActionsMixin,
+    TextPreviewMixin,
+    admin.ModelAdmin,
+):
     list_display = (
-        'text',
+        'text_preview',
         'post',
         'author',
     )
     list_filter = ('created_at',)
-    search_fields = ('author',)
+    list_select_related = ('post', 'author')
+    ordering = ('-created_at', '-pk')
+    deferred_fields = ('text', 'post__text')
+    autocomplete_fields = ('post', 'author')
+    search_fields = ('=author__username',)
+    actions = ('delete_selected', 'export_csv', 'export_jsonl')
+    bulk_delete_function = staticmethod(bulk_delete_comments)
+    repr_field = 'text'
+
+    def save_model(self, request, obj, form, change):
+        post_ids = {obj.post_id}
+        if change and 'post' in form.changed_data:
+            post_ids.add(form.initial['post'])
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            recount_comments(Post.objects.filter(pk__in=post_ids))
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            recount_comments(Post.objects.filter(pk=obj.post_id))
@@ -1,3 +1,8 @@
 MAX_CHARFIELD_LENGTH = 256
 PAGINATE_BY = 10
 MAX_DISPLAY_LENGTH = 20
+COMMENTS_PER_PAGE = 20
+ADMIN_TEXT_PREVIEW_LENGTH = 100
+BULK_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+ADMIN_DELETE_PREVIEW_LENGTH = 100
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Comment, Location, Post
+from core.export import EXPORT_FORMATS, iter_export
+
+MODELS = {
+    'post': Post,
+    'comment': Comment,
+    'category': Category,
+    'location': Location,
+}
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка публикаций, комментариев и справочников.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=MODELS)
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='csv',
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки; по умолчанию — стандартный вывод.',
+        )
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, model, export_format, output, chunk_size,
+               **options):
+        blocks = iter_export(
+            MODELS[model].objects.all(), export_format, chunk_size
+        )
+        if output is None:
+            for block in blocks:
+                self.stdout.write(block, ending='')
+            return
+        with open(output, 'w', encoding='utf-8', newline='') as file:
+            for block in blocks:
+                file.write(block)
+        self.stdout.write(self.style.SUCCESS(f'Выгружено в {output}'))
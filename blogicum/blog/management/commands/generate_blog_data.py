@@ -0,0 +1,317 @@
+import random
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+
+from blog.models import Category, Comment, Location, Post
+from core.search import (
+    POST_SEARCH_TRIGGERS_SQL, install_post_search
+)
+from core.signals import bulk_changed
+
+User = get_user_model()
+
+WORDS = (
+    'утро вечер день ночь город река лес море горы дорога поезд вокзал '
+    'книга письмо кофе чай обед ужин друг соседи кот собака сад дождь '
+    'снег солнце ветер прогулка поход работа отпуск праздник музыка '
+    'кино театр выставка рынок магазин школа история встреча новости'
+).split()
+PASSWORD = 'password'
+# Тексты берутся из заранее собранного набора: генерировать каждый
+# заново в несколько раз дольше самой вставки.
+TEXT_POOL_SIZE = 4096
+SQLITE_CACHE_KIB = 512 * 1024
+EPOCH = datetime(1970, 1, 1)
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def zipf_weights(n, exponent):
+    """Накопленные веса закона Ципфа: первые элементы самые частые."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные для нагрузочного тестирования: '
+        'пользователей, публикации и комментарии с реалистичным перекосом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument(
+            '--unpublished-categories', type=float, default=0.1,
+            help='Доля скрытых категорий.',
+        )
+        parser.add_argument(
+            '--unpublished-posts', type=float, default=0.05,
+            help='Доля снятых с публикации постов.',
+        )
+        parser.add_argument(
+            '--future-posts', type=float, default=0.05,
+            help='Доля отложенных публикаций.',
+        )
+        parser.add_argument(
+            '--no-analyze', action='store_true',
+            help='Не собирать статистику планировщика после генерации.',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if options['posts'] and not options['users']:
+            raise CommandError('Для публикаций нужны авторы: --users.')
+        if options['comments'] and not options['posts']:
+            raise CommandError('Для комментариев нужны публикации: --posts.')
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.pools = {}
+        self.connection = connections[options['database']]
+        self.ops = self.connection.ops
+        self.now = time.time()
+        started = time.monotonic()
+        with self.bulk_load_settings():
+            self.generate(options)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {options["users"]}, '
+            f'публикаций {options["posts"]}, '
+            f'комментариев {options["comments"]} за {elapsed:.1f} с'
+        ))
+
+    def generate(self, options):
+        users = self.generate_users(options['users'])
+        categories = self.generate_categories(options['categories'])
+        locations = self.generate_locations(options['locations'])
+        # Комментарии распределяются заранее, чтобы сразу записать
+        # comment_count и не пересчитывать его отдельным проходом.
+        comment_posts = self.pick_comment_posts(
+            options['posts'], options['comments']
+        )
+        with self.search_index_suspended():
+            posts, pub_dates = self.generate_posts(
+                options['posts'], users, categories, locations,
+                Counter(comment_posts),
+            )
+        self.generate_comments(comment_posts, posts, pub_dates, users)
+
+        self.reset_sequences()
+        if not options['no_analyze']:
+            with self.connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        bulk_changed.send(sender=type(self))
+
+    @contextmanager
+    def bulk_load_settings(self):
+        """Настройки SQLite для массовой вставки на время команды.
+
+        Комментарии вставляются в случайном порядке постов, и индексам
+        не хватает стандартного кеша в 2000 страниц; fsync на каждую
+        пачку тестовым данным не нужен.
+        """
+        if self.connection.vendor != 'sqlite':
+            yield
+            return
+        # Внутри транзакции SQLite не даёт менять synchronous.
+        pragmas = {'cache_size': -SQLITE_CACHE_KIB}
+        if not self.connection.in_atomic_block:
+            pragmas['synchronous'] = 0
+        previous = {}
+        with self.connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}')
+                previous[name], = cursor.fetchone()
+                cursor.execute(f'PRAGMA {name} = {value}')
+        try:
+            yield
+        finally:
+            with self.connection.cursor() as cursor:
+                for name, value in previous.items():
+                    cursor.execute(f'PRAGMA {name} = {value}')
+
+    @contextmanager
+    def search_index_suspended(self):
+        """Без триггеров FTS5 на время вставки постов.
+
+        Индекс один раз перестраивается в конце, это быстрее, чем
+        обновлять его на каждой строке.
+        """
+        if self.connection.vendor != 'sqlite':
+            yield
+            return
+        with self.connection.cursor() as cursor:
+            for name in POST_SEARCH_TRIGGERS_SQL:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        try:
+            yield
+        finally:
+            install_post_search(self.connection)
+
+    def next_ids(self, model, count):
+        start = (model.objects.using(self.options['database']).aggregate(
+            last=Max('pk')
+        )['last'] or 0) + 1
+        return range(start, start + count)
+
+    def insert(self, model, columns, rows):
+        """INSERT пачками через executemany, по транзакции на пачку."""
+        qn = self.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            qn(model._meta.db_table),
+            ', '.join(qn(model._meta.get_field(c).column) for c in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.options['batch_size']:
+                self.execute_batch(sql, batch)
+                batch = []
+        if batch:
+            self.execute_batch(sql, batch)
+
+    def execute_batch(self, sql, batch):
+        with transaction.atomic(using=self.options['database']):
+            with self.connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+        if self.options['verbosity'] > 1:
+            self.stdout.write(f'{len(batch)} строк')
+
+    def datetime_value(self, timestamp):
+        # Наивное время в UTC адаптер бэкенда пропускает без make_naive,
+        # а на миллионах строк это заметная доля времени.
+        return self.ops.adapt_datetimefield_value(
+            EPOCH + timedelta(seconds=int(timestamp))
+        )
+
+    def text(self, min_words, max_words):
+        pool = self.pools.get((min_words, max_words))
+        if pool is None:
+            pool = self.pools[min_words, max_words] = [
+                ' '.join(self.rng.choices(
+                    WORDS, k=self.rng.randint(min_words, max_words)
+                )).capitalize()
+                for _ in range(TEXT_POOL_SIZE)
+            ]
+        return self.rng.choice(pool)
+
+    def generate_users(self, count):
+        ids = self.next_ids(User, count)
+        password = make_password(PASSWORD)
+        joined = self.datetime_value(self.now - 365 * DAY)
+        self.insert(User, (
+            'id', 'password', 'is_superuser', 'username', 'first_name',
+            'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+        ), (
+            (pk, password, False, f'user{pk}', '', '',
+             f'user{pk}@example.com', False, True, joined)
+            for pk in ids
+        ))
+        return ids
+
+    def generate_categories(self, count):
+        ids = self.next_ids(Category, count)
+        hidden = set(self.rng.sample(
+            ids, round(count * self.options['unpublished_categories'])
+        ))
+        created = self.datetime_value(self.now)
+        self.insert(Category, (
+            'id', 'is_published', 'created_at', 'title', 'description', 'slug',
+        ), (
+            (pk, pk not in hidden, created, self.text(1, 3),
+             self.text(5, 15), f'category-{pk}')
+            for pk in ids
+        ))
+        return ids
+
+    def generate_locations(self, count):
+        ids = self.next_ids(Location, count)
+        created = self.datetime_value(self.now)
+        self.insert(Location, ('id', 'is_published', 'created_at', 'name'), (
+            (pk, True, created, self.text(1, 2)) for pk in ids
+        ))
+        return ids
+
+    def pick_comment_posts(self, posts, comments):
+        """Индексы постов для комментариев: немногие посты горячие."""
+        if not posts:
+            return array('l')
+        weights = zipf_weights(posts, 0.8)
+        return array('l', self.rng.choices(
+            range(posts), cum_weights=weights, k=comments
+        ))
+
+    def generate_posts(self, count, users, categories, locations,
+                       comment_counts):
+        ids = self.next_ids(Post, count)
+        author_weights = zipf_weights(len(users), 1.0)
+        pub_dates = array('d')
+        future = self.options['future_posts']
+        hidden = self.options['unpublished_posts']
+        now = self.now
+        rng = self.rng
+
+        def rows():
+            for index, pk in enumerate(ids):
+                if rng.random() < future:
+                    pub_date = now + rng.uniform(HOUR, 30 * DAY)
+                else:
+                    pub_date = now - rng.uniform(0, 3 * 365 * DAY)
+                pub_dates.append(pub_date)
+                pub_date = self.datetime_value(pub_date)
+                yield (
+                    pk, rng.random() >= hidden, pub_date,
+                    self.text(2, 8), self.text(20, 120), pub_date,
+                    rng.choices(users, cum_weights=author_weights)[0],
+                    rng.choice(locations) if locations else None,
+                    rng.choice(categories) if categories else None,
+                    '', comment_counts[index], pub_date,
+                )
+
+        self.insert(Post, (
+            'id', 'is_published', 'created_at', 'title', 'text', 'pub_date',
+            'author', 'location', 'category', 'image', 'comment_count',
+            'updated_at',
+        ), rows())
+        return ids, pub_dates
+
+    def generate_comments(self, comment_posts, posts, pub_dates, users):
+        ids = self.next_ids(Comment, len(comment_posts))
+        rng = self.rng
+
+        def rows():
+            for pk, index in zip(ids, comment_posts):
+                created = pub_dates[index] + rng.uniform(60, 30 * DAY)
+                yield (
+                    pk, self.text(3, 30), posts[index], rng.choice(users),
+                    self.datetime_value(created),
+                )
+
+        self.insert(
+            Comment, ('id', 'text', 'post', 'author', 'created_at'), rows()
+        )
+
+    def reset_sequences(self):
+        statements = self.ops.sequence_reset_sql(
+            no_style(), [User, Category, Location, Post, Comment]
+        )
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
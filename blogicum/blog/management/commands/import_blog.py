@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import IntegrityError, transaction
+
+from core.loader import BlogLoader, iter_json_array, iter_json_lines
+from core.signals import bulk_changed
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковая загрузка фикстур блога (формат dumpdata или JSONL) '
+        'пачками через массовую вставку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument(
+            '--format', dest='input_format', choices=('json', 'jsonl'),
+            help='По умолчанию определяется по расширению файла.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, paths, input_format, batch_size, database,
+               **options):
+        loader = BlogLoader(batch_size, using=database)
+        try:
+            # Все файлы — одна транзакция: ссылки между ними допустимы.
+            with transaction.atomic(using=database):
+                for path in paths:
+                    self.load_file(loader, path, input_format, options)
+        except (
+            OSError, ValueError, DeserializationError, IntegrityError
+        ) as error:
+            raise CommandError(error)
+        finally:
+            if loader.total:
+                bulk_changed.send(sender=type(self))
+
+        for label, count in loader.loaded.items():
+            self.stdout.write(f'{label}: {count}')
+        for label, count in loader.skipped.items():
+            self.stdout.write(f'{label}: пропущено {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {loader.total}, '
+            f'{loader.rows_per_second:.0f} строк/с'
+        ))
+
+    def load_file(self, loader, path, input_format, options):
+        file_format = input_format or (
+            'jsonl' if path.endswith('.jsonl') else 'json'
+        )
+        with open(path, encoding='utf-8') as file:
+            loader.load(
+                iter_json_lines(file) if file_format == 'jsonl'
+                else iter_json_array(file)
+            )
+        if options['verbosity'] > 1:
+            self.stdout.write(
+                f'{path}: {loader.total} строк, '
+                f'{loader.rows_per_second:.0f} строк/с'
+            )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from blog.models import Post
+from core.services import comment_count_subquery, recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Post.comment_count с фактическим числом комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать посты с расхождением.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, dry_run, batch_size, **options):
+        drifted = (
+            Post.objects.annotate(actual=comment_count_subquery())
+            .exclude(comment_count=F('actual'))
+            .values_list('pk', 'comment_count', 'actual')
+            .order_by('pk')
+        )
+        post_ids = []
+        for pk, stored, actual in drifted.iterator(chunk_size=batch_size):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Пост {pk}: {stored} -> {actual}')
+            post_ids.append(pk)
+
+        if not dry_run:
+            for start in range(0, len(post_ids), batch_size):
+                with transaction.atomic():
+                    recount_comments(Post.objects.filter(
+                        pk__in=post_ids[start:start + batch_size]
+                    ))
+
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} расхождений: {len(post_ids)}'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:08
+
+import core.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def install_post_search(apps, schema_editor):
+    core.search.install_post_search(schema_editor.connection)
+
+
+def uninstall_post_search(apps, schema_editor):
+    core.search.uninstall_post_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_comment_post_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blog.post')),
+                ('title', models.TextField()),
+                ('text', models.TextField()),
+                ('document', core.search.FullTextField(db_column='blog_post_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(install_post_search, uninstall_post_search),
+    ]
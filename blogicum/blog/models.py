@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from core.models import IsPublishedAbsract, CreatedAt
+from core.search import POST_SEARCH_TABLE, FullTextField
 from .const import MAX_CHARFIELD_LENGTH, MAX_DISPLAY_LENGTH
 
 User = get_user_model()
@@ -63,6 +64,7 @@ class Post(IsPublishedAbsract, CreatedAt):
         on_delete=models.CASCADE,
         verbose_name='Автор публикации',
         related_name='posts',
+        db_index=False,
     )
     location = models.ForeignKey(
         Location,
@@ -78,6 +80,7 @@ class Post(IsPublishedAbsract, CreatedAt):
         null=True,
         on_delete=models.SET_NULL,
         verbose_name='Категория',
+        db_index=False,
     )
     image = models.ImageField(
         upload_to="images",
@@ -85,16 +88,65 @@ class Post(IsPublishedAbsract, CreatedAt):
         null=True,
         verbose_name="Изображение",
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменено')
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        # Индексы под выборки главной страницы, категории и профиля:
+        # фильтр и сортировка по (pub_date, id) без временной сортировки.
+        # Индексы по author и category заменяют одиночные индексы FK.
+        # Полный индекс по (pub_date, id) — для списка в админке.
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'),
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=('pub_date', 'id'),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date', 'id'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title[:MAX_DISPLAY_LENGTH]
 
 
+class PostSearchIndex(models.Model):
+    """Полнотекстовый индекс постов (FTS5, ведётся триггерами БД)."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+    )
+    title = models.TextField()
+    text = models.TextField()
+    document = FullTextField(db_column=POST_SEARCH_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = POST_SEARCH_TABLE
+
+
 class Comment(CreatedAt):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
@@ -102,6 +154,7 @@ class Comment(CreatedAt):
         on_delete=models.CASCADE,
         related_name='comments',
         verbose_name='Пост',
+        db_index=False,
     )
     author = models.ForeignKey(
         User,
@@ -113,6 +166,21 @@ class Comment(CreatedAt):
     class Meta(CreatedAt.Meta):
         verbose_name = 'Коментарий'
         verbose_name_plural = 'Коментарии'
+        # Комментарии поста выбираются порциями по (created_at, id),
+        # список в админке сортируется и фильтруется по created_at.
+        indexes = (
+            models.Index(
+                fields=('created_at', 'id'),
+                name='comment_created_at_idx',
+            ),
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self) -> str:
-        return self.text[:MAX_DISPLAY_LENGTH]
+        # В списке админки text отложен, а его начало приходит
+        # аннотацией text_start: подпись не стоит отдельного запроса.
+        text = getattr(self, 'text_start', None)
+        return (self.text if text is None else text)[:MAX_DISPLAY_LENGTH]
@@ -0,0 +1,93 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from core.autocomplete import POST, reset_title_index, update_title_index
+from core.caching import (
+    PAGE_CACHE_NAMESPACE,
+    POST_CARD_NAMESPACE,
+    bump_version,
+    page_cache_alias,
+)
+from core.metrics import record_write
+from core.paginators import POST_COUNT_NAMESPACE
+from core.search import install_post_search
+from core.signals import bulk_changed
+from .models import Category, Comment, Location, Post
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Category)
+def invalidate_post_counts(**kwargs):
+    bump_version(POST_COUNT_NAMESPACE)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def invalidate_pages(**kwargs):
+    bump_version(PAGE_CACHE_NAMESPACE, using=page_cache_alias())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(**kwargs):
+    bump_version(POST_CARD_NAMESPACE)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_writes(sender, signal, created=False, **kwargs):
+    if signal is post_delete:
+        action = 'delete'
+    else:
+        action = 'create' if created else 'update'
+    record_write(sender._meta.model_name, action)
+
+
+@receiver(post_migrate)
+def repair_post_search(sender, using, **kwargs):
+    """Восстановить триггеры поиска после пересоздания таблицы постов."""
+    if sender.label == 'blog':
+        install_post_search(connections[using])
+
+
+@receiver(post_save, sender=Post)
+def index_post_title(instance, **kwargs):
+    update_title_index('update_post', instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post_title(instance, **kwargs):
+    update_title_index('remove', POST, instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def index_category_title(instance, **kwargs):
+    update_title_index('update_category', instance)
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category_title(instance, **kwargs):
+    update_title_index('remove_category', instance)
+
+
+@receiver(bulk_changed)
+def invalidate_after_bulk_change(**kwargs):
+    bump_version(POST_COUNT_NAMESPACE)
+    bump_version(PAGE_CACHE_NAMESPACE, using=page_cache_alias())
+    bump_version(POST_CARD_NAMESPACE)
+    reset_title_index()
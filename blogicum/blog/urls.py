@@ -15,11 +15,26 @@ urlpatterns = [
         views.PostDetailView.as_view(),
         name='post_detail',
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments',
+    ),
     path(
         'category/<slug:category_slug>/',
         views.CategoryListView.as_view(),
         name='category_posts',
     ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search',
+    ),
+    path(
+        'search/autocomplete/',
+        views.AutocompleteView.as_view(),
+        name='autocomplete',
+    ),
     path(
         'profile/edit/',
         views.UserProfileUpdateView.as_view(),
@@ -1,73 +1,132 @@
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.db.models.query import QuerySet
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
     ListView,
+    TemplateView,
     UpdateView,
+    View,
 )
 
 from .const import PAGINATE_BY
 from .forms import CommentForm, PostForm, UserEditForm
 from .models import Category, Post
-from core.mixins import AuthorCheckMixin, CommentMixin, PostMixin
-from core.services import filter_published_posts, annotate_with_comment_count
+from core.autocomplete import POST, get_title_index
+from core.mixins import (
+    AnonymousPageCacheMixin,
+    AuthorCheckMixin,
+    CachedCountMixin,
+    CommentMixin,
+    CommentPageMixin,
+    CursorPaginationMixin,
+    IdentityMapMixin,
+    PostCardCacheMixin,
+    PostMixin,
+)
+from core.paginators import ElidedPaginator
+from core.services import (
+    change_comment_count,
+    filter_published_posts,
+    get_visible_post_or_404,
+    search_posts,
+    select_post_relations,
+)
 
 User = get_user_model()
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, CommentPageMixin, DetailView):
     model = Post
     template_name = "blog/detail.html"
     pk_url_kwarg = "post_id"
 
     def get_object(self, queryset=None):
-        post = get_object_or_404(Post, pk=self.kwargs["post_id"])
-        if self.request.user == post.author:
-            return get_object_or_404(Post, pk=self.kwargs["post_id"])
-        return get_object_or_404(
-            filter_published_posts(Post.objects), pk=self.kwargs["post_id"]
+        return get_visible_post_or_404(
+            self.kwargs["post_id"], self.request.user
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related("author")
+        context["comments"] = self.get_comments_page(self.object)
+        return context
+
+
+class PostCommentsView(
+    AnonymousPageCacheMixin, CommentPageMixin, TemplateView
+):
+    """Следующая порция комментариев поста для кнопки «Показать ещё»."""
+
+    template_name = "includes/comments.html"
+    extra_context = {"comments_fragment": True}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["post"] = get_visible_post_or_404(
+            self.kwargs["post_id"], self.request.user
+        )
+        context["comments"] = self.get_comments_page(
+            context["post"], self.request.GET.get("cursor")
+        )
         return context
 
 
-class IndexListView(ListView):
+class IndexListView(
+    AnonymousPageCacheMixin,
+    PostCardCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = PAGINATE_BY
+    allow_count_estimate = True
+
+    def get_count_queryset(self):
+        return filter_published_posts(Post.objects.all())
 
     def get_queryset(self):
-        return annotate_with_comment_count(
-            filter_published_posts(Post.objects.all())
-        )
+        return select_post_relations(self.get_count_queryset())
 
 
-class CategoryListView(LoginRequiredMixin, ListView):
+class CategoryListView(
+    LoginRequiredMixin,
+    IdentityMapMixin,
+    PostCardCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = PAGINATE_BY
 
     def get_category(self):
-        return get_object_or_404(
+        return self.identity_map.get_or_404(
             Category, is_published=True, slug=self.kwargs['category_slug']
         )
 
+    def get_count_queryset(self):
+        return filter_published_posts(self.get_category().posts)
+
+    def get_count_key(self):
+        return ('category', self.kwargs['category_slug'])
+
     def get_queryset(self) -> QuerySet[Any]:
-        return annotate_with_comment_count(
-            filter_published_posts(self.get_category().posts)
-        )
+        return select_post_relations(self.get_count_queryset())
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -75,29 +134,89 @@ class CategoryListView(LoginRequiredMixin, ListView):
         return context
 
 
-class UserProfileListView(ListView):
+class UserProfileListView(
+    IdentityMapMixin,
+    PostCardCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/profile.html'
-    context_object_name = 'page_obj'
     paginate_by = PAGINATE_BY
 
     def get_author(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        return self.identity_map.get_or_404(
+            User, username=self.kwargs['username']
+        )
 
-    def get_queryset(self) -> QuerySet[Any]:
-        queryset = annotate_with_comment_count(self.get_author().posts)
+    def is_owner(self):
+        return self.request.user.get_username() == self.kwargs['username']
+
+    def get_count_queryset(self):
+        queryset = self.get_author().posts.all()
 
-        if self.request.user != self.get_author():
+        if not self.is_owner():
             queryset = filter_published_posts(queryset)
 
         return queryset
 
+    def get_count_key(self):
+        return ('profile', self.kwargs['username'], self.is_owner())
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return select_post_relations(self.get_count_queryset())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.get_author()
         return context
 
 
+class PostSearchView(PostCardCacheMixin, ListView):
+    """Поиск по опубликованным постам, по убыванию релевантности."""
+
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = PAGINATE_BY
+    paginator_class = ElidedPaginator
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return search_posts(
+            filter_published_posts(Post.objects.all()),
+            self.get_search_query(),
+        ).select_related('category', 'location', 'author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        context['paginator_query'] = urlencode({'q': context['query']}) + '&'
+        return context
+
+
+class AutocompleteView(View):
+    """Подсказки заголовков постов и категорий по началу слова."""
+
+    def get(self, request, *args, **kwargs):
+        results = get_title_index().search(
+            request.GET.get('q', ''),
+            getattr(settings, 'AUTOCOMPLETE_LIMIT', 10),
+        )
+        return JsonResponse({'results': [
+            {
+                'type': kind,
+                'title': title,
+                'url': reverse('blog:post_detail', args=(pk,))
+                if kind == POST
+                else reverse('blog:category_posts', args=(payload,)),
+            }
+            for kind, pk, title, payload in results
+        ]})
+
+
 class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = UserEditForm
@@ -116,7 +235,10 @@ class CommentCreateView(CommentMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        return super().form_valid(form)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            change_comment_count(form.instance.post_id, 1)
+        return response
 
 
 class CommentEditUpdateView(CommentMixin, AuthorCheckMixin, UpdateView):
@@ -124,7 +246,11 @@ class CommentEditUpdateView(CommentMixin, AuthorCheckMixin, UpdateView):
 
 
 class CommentDeleteDeleteView(CommentMixin, AuthorCheckMixin, DeleteView):
-    pass
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            change_comment_count(self.object.post_id, -1)
+        return response
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
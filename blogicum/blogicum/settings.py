@@ -21,6 +21,7 @@ STATICFILES_DIRS = [
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -32,11 +33,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.QueryLogMiddleware',
+    'core.middleware.DuplicateQueryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -52,7 +58,9 @@ INTERNAL_IPS = [
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени рендера для Server-Timing.
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -66,8 +74,135 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Продакшен-профиль: шаблоны компилируются один раз на процесс.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        (
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        ),
+    ]
+
+# Компилировать шаблоны из templates/ при старте процесса.
+TEMPLATES_WARMUP = not DEBUG
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Время жизни закешированного числа публикаций в списках, в секундах;
+# не дольше, чем до ближайшей отложенной публикации.
+POST_COUNT_CACHE_TIMEOUT = 60
+
+# Для таблиц больше этого размера главная страница берёт оценку числа
+# публикаций из статистики планировщика вместо COUNT(*).
+POST_COUNT_ESTIMATE_THRESHOLD = 100_000
+
+# Кеш страниц ленты, категорий и публикаций для анонимных читателей.
+# Подойдёт любой бэкенд из CACHES.
+PAGE_CACHE_ENABLED = False
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = 300
+
+# Время жизни закешированной карточки поста в списках, в секундах.
+POST_CARD_CACHE_TIMEOUT = 3600
+
+# Подсказки заголовков: предельное число ключей индекса в памяти процесса
+# (бюджет в ключах, не в байтах: около 130 байт на ключ; на время фоновой
+# перестройки в памяти два индекса), интервал перестройки в секундах и
+# число подсказок в ответе.
+AUTOCOMPLETE_MAX_ENTRIES = 500_000
+AUTOCOMPLETE_REBUILD_INTERVAL = 300
+AUTOCOMPLETE_LIMIT = 10
+
+# Доля запросов, для которых PerformanceMiddleware замеряет SQL, шаблоны
+# и представление и пишет их в Server-Timing и журнал core.middleware.
+PERFORMANCE_SAMPLE_RATE = 0.01
+
+# Профили запросов сотрудников: каталог, число хранимых профилей, срок
+# действия токена в секундах и интервал снятия стеков для flamegraph.
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_KEEP = 50
+PROFILING_TOKEN_MAX_AGE = 3600
+PROFILING_SAMPLE_INTERVAL = 0.001
+
+# Фоновый профайлер: раз в SAMPLING_PROFILER_INTERVAL секунд снимает
+# стеки потоков, занятых запросами, и копит их в памяти процесса не
+# более чем для SAMPLING_PROFILER_MAX_STACKS различных стеков. Имена
+# кадров кешируются для SAMPLING_PROFILER_MAX_FRAME_NAMES объектов кода.
+SAMPLING_PROFILER_ENABLED = False
+SAMPLING_PROFILER_INTERVAL = 0.01
+SAMPLING_PROFILER_MAX_STACKS = 10_000
+SAMPLING_PROFILER_MAX_FRAME_NAMES = 10_000
+
+# Журнал медленных запросов (QueryLogMiddleware): запросы дольше
+# SLOW_QUERY_THRESHOLD секунд (None — выключено) пишутся с планом,
+# представлением и местом вызова в SLOW_QUERY_LOG_FILE; страница
+# сотрудников показывает последние записи.
+SLOW_QUERY_THRESHOLD = 0.2
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'slow_queries.log'
+SLOW_QUERY_PAGE_SIZE = 100
+
+# Поиск N+1: в доле NPLUSONE_SAMPLE_RATE запросов SELECT, повторённый
+# NPLUSONE_THRESHOLD раз с разными значениями, пишется в журнал
+# core.nplusone вместе с шаблоном и представлением. В строгом режиме
+# (его включают тесты) такой запрос поднимает DuplicateQueriesError.
+NPLUSONE_SAMPLE_RATE = 0.01
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_STRICT = False
+
+# Метрики /metrics в текстовом формате Prometheus, доступные сотрудникам
+# и адресам METRICS_ALLOWED_IPS. За обратным прокси на том же хосте все
+# запросы приходят с 127.0.0.1, поэтому добавлять его стоит, только если
+# снаружи к приложению не попасть. Если задан каталог
+# METRICS_MULTIPROCESS_DIR, каждый процесс раз в METRICS_FLUSH_INTERVAL
+# секунд пишет в него свой файл, а /metrics складывает файлы всех
+# процессов. Каталог стоит очищать при развёртывании.
+METRICS_ALLOWED_IPS = []
+METRICS_MULTIPROCESS_DIR = None
+METRICS_FLUSH_INTERVAL = 1.0
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'core.nplusone': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'core.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 
 DATABASES = {
     'default': {
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 from blog.views import AuthCreateView
+from core.views import MetricsView
 
 handler500 = 'pages.views.server_error'
 
@@ -14,6 +15,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('blog.urls', namespace='blog')),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('__perf__/', include('core.urls', namespace='core')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path(
         'auth/registration/',
         AuthCreateView.as_view(),
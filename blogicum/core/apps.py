@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from .profiling import start_sampling_profiler
+        from .warmup import warm_templates_on_startup
+
+        warm_templates_on_startup()
+        if getattr(settings, 'SAMPLING_PROFILER_ENABLED', False):
+            start_sampling_profiler()
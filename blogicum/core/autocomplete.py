@@ -0,0 +1,283 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import chain
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+logger = logging.getLogger(__name__)
+
+POST = 'post'
+CATEGORY = 'category'
+
+# Ключи обрезаются до этой длины: на подсказки она не влияет, а память
+# на длинных заголовках экономит.
+KEY_LENGTH = 24
+SEPARATOR = '\x00'
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е').replace(SEPARATOR, ' ')
+
+
+def make_entry(key, kind, pk):
+    # Одна строка вместо кортежа вдвое экономит память на ключ.
+    return f'{key}{SEPARATOR}{kind}{SEPARATOR}{pk}'
+
+
+def parse_entry(entry):
+    key, kind, pk = entry.split(SEPARATOR)
+    return key, kind, int(pk)
+
+
+class PrefixIndex:
+    """Отсортированный массив ключей для поиска по префиксу.
+
+    Ключи — хвосты заголовка, начинающиеся с каждого слова, поэтому
+    «лес» находит и «Лес у реки», и «Прогулка в лесу». Бюджет памяти
+    задаётся числом ключей ``max_entries``, а не байтами: сверх него
+    объекты не добавляются.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = []
+        self.items = {}
+        self.keys = {}
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def make_keys(title):
+        title = normalize(title)
+        return tuple(sorted({
+            title[match.start():match.start() + KEY_LENGTH]
+            for match in re.finditer(r'\w+', title)
+        }))
+
+    def load(self, objects):
+        """Заполнить индекс разом из ``(kind, pk, title, payload)``."""
+        with self.lock:
+            for kind, pk, title, payload in objects:
+                keys = self.make_keys(title)
+                if len(self.entries) + len(keys) > self.max_entries:
+                    break
+                self.items[kind, pk] = (title, payload)
+                self.keys[kind, pk] = keys
+                self.entries.extend(
+                    make_entry(key, kind, pk) for key in keys
+                )
+            self.entries.sort()
+
+    def add(self, kind, pk, title, payload=None):
+        with self.lock:
+            self.remove(kind, pk)
+            keys = self.make_keys(title)
+            if len(self.entries) + len(keys) > self.max_entries:
+                return False
+            self.items[kind, pk] = (title, payload)
+            self.keys[kind, pk] = keys
+            for key in keys:
+                insort(self.entries, make_entry(key, kind, pk))
+            return True
+
+    def remove(self, kind, pk):
+        with self.lock:
+            self.items.pop((kind, pk), None)
+            for key in self.keys.pop((kind, pk), ()):
+                position = bisect_left(
+                    self.entries, make_entry(key, kind, pk)
+                )
+                del self.entries[position]
+
+    def search(self, prefix, limit, accept=None):
+        """Объекты, в заголовке которых есть слово с началом ``prefix``.
+
+        ``accept(kind, payload)`` отсеивает объекты, которые сейчас
+        нельзя показывать.
+        """
+        query = normalize(prefix).strip()
+        if not query:
+            return []
+        key = query[:KEY_LENGTH]
+        results = []
+        seen = set()
+        with self.lock:
+            position = bisect_left(self.entries, key)
+            while len(results) < limit and position < len(self.entries):
+                entry = self.entries[position]
+                position += 1
+                if not entry.startswith(key):
+                    break
+                _, kind, pk = parse_entry(entry)
+                if (kind, pk) in seen:
+                    continue
+                seen.add((kind, pk))
+                title, payload = self.items[kind, pk]
+                if len(query) > KEY_LENGTH and query not in normalize(title):
+                    continue
+                if accept is None or accept(kind, payload):
+                    results.append((kind, pk, title, payload))
+        return results
+
+
+class TitleIndex(PrefixIndex):
+    """Индекс заголовков опубликованных постов и категорий.
+
+    Посты с отложенной публикацией попадают в индекс сразу, а
+    отсеиваются при поиске по ``pub_date``; посты скрытых категорий —
+    по множеству опубликованных категорий.
+    """
+
+    def __init__(self, max_entries):
+        super().__init__(max_entries)
+        self.published_categories = set()
+
+    def build(self):
+        categories = Category.objects.filter(is_published=True).values_list(
+            'pk', 'title', 'slug'
+        )
+        posts = (
+            Post.objects.filter(is_published=True)
+            .order_by('-pub_date')
+            .values_list('pk', 'title', 'pub_date', 'category_id')
+        )
+        for pk, title, slug in categories:
+            self.published_categories.add(pk)
+        self.load(chain(
+            ((CATEGORY, pk, title, slug) for pk, title, slug in categories),
+            (
+                (POST, pk, title, (pub_date, category_id))
+                for pk, title, pub_date, category_id
+                in posts.iterator(chunk_size=10_000)
+            ),
+        ))
+        return self
+
+    def update_post(self, post):
+        if post.is_published:
+            self.add(POST, post.pk, post.title,
+                     (post.pub_date, post.category_id))
+        else:
+            self.remove(POST, post.pk)
+
+    def update_category(self, category):
+        if category.is_published:
+            self.published_categories.add(category.pk)
+            self.add(CATEGORY, category.pk, category.title, category.slug)
+        else:
+            self.published_categories.discard(category.pk)
+            self.remove(CATEGORY, category.pk)
+
+    def remove_category(self, category):
+        self.published_categories.discard(category.pk)
+        self.remove(CATEGORY, category.pk)
+
+    def accept(self, kind, payload):
+        if kind != POST:
+            return True
+        pub_date, category_id = payload
+        return (
+            pub_date <= timezone.now()
+            and category_id in self.published_categories
+        )
+
+    def search(self, prefix, limit, accept=None):
+        return super().search(prefix, limit, accept or self.accept)
+
+
+_title_index = None
+_built_at = None
+# Индекс устарел после массового изменения данных.
+_stale = False
+# Изменения, пришедшие во время фоновой перестройки: новый индекс мог
+# прочитать строки раньше, поэтому они повторяются на нём перед заменой.
+_pending = None
+_rebuilder = None
+_build_lock = threading.Lock()
+
+
+def new_title_index():
+    return TitleIndex(getattr(settings, 'AUTOCOMPLETE_MAX_ENTRIES', 500_000))
+
+
+def get_title_index():
+    """Индекс заголовков текущего процесса.
+
+    Первый раз строится при запросе. Сигналы обновляют индекс только в
+    процессе, где сохранили модель, поэтому раз в
+    AUTOCOMPLETE_REBUILD_INTERVAL секунд и после массовых изменений он
+    перестраивается в фоновом потоке, а запросы до замены получают
+    прежний.
+    """
+    global _title_index, _built_at, _stale
+    interval = getattr(settings, 'AUTOCOMPLETE_REBUILD_INTERVAL', 300)
+    with _build_lock:
+        if _title_index is None:
+            _built_at = time.monotonic()
+            _title_index = new_title_index().build()
+            _stale = False
+        elif _pending is None and (
+            _stale or time.monotonic() - _built_at > interval
+        ):
+            _stale = False
+            start_rebuild()
+        return _title_index
+
+
+def start_rebuild():
+    global _pending, _rebuilder
+    _pending = []
+    _rebuilder = threading.Thread(
+        target=rebuild_title_index, name='title-index-rebuild', daemon=True
+    )
+    _rebuilder.start()
+
+
+def rebuild_title_index():
+    global _title_index, _built_at, _pending
+    started = time.monotonic()
+    try:
+        index = new_title_index().build()
+    except Exception:
+        logger.exception('Не удалось перестроить индекс заголовков')
+        index = None
+    finally:
+        connection.close()
+    with _build_lock:
+        if index is not None:
+            for method, args in _pending:
+                getattr(index, method)(*args)
+            _title_index = index
+        # После ошибки следующая попытка — через интервал.
+        _built_at = started
+        _pending = None
+
+
+def update_title_index(method, *args):
+    """Вызвать метод индекса и повторить его на строящейся замене."""
+    with _build_lock:
+        index = _title_index
+        if _pending is not None:
+            _pending.append((method, args))
+    if index is not None:
+        getattr(index, method)(*args)
+
+
+def reset_title_index():
+    """Перестроить индекс при следующем обращении, не отбрасывая его."""
+    global _stale
+    with _build_lock:
+        _stale = True
+
+
+def discard_title_index():
+    global _title_index, _stale
+    with _build_lock:
+        _title_index = None
+        _stale = False
@@ -0,0 +1,75 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.utils import timezone
+
+from .services import next_scheduled_publication
+
+PAGE_CACHE_NAMESPACE = 'page'
+POST_CARD_NAMESPACE = 'post_card'
+
+
+def get_cache(using=None):
+    return caches[using or DEFAULT_CACHE_ALIAS]
+
+
+def get_version(namespace, using=None):
+    """Текущее поколение пространства ключей кеша."""
+    return get_cache(using).get_or_set(
+        f'{namespace}:version', 1, timeout=None
+    )
+
+
+def bump_version(namespace, using=None):
+    """Сделать недействительными все ключи пространства разом."""
+    cache = get_cache(using)
+    key = f'{namespace}:version'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def make_key(namespace, *parts, using=None):
+    return ':'.join(
+        (namespace, str(get_version(namespace, using)), *map(str, parts))
+    )
+
+
+def page_cache_alias():
+    return getattr(settings, 'PAGE_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)
+
+
+def page_cache_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return make_key(PAGE_CACHE_NAMESPACE, path, using=page_cache_alias())
+
+
+def publication_timeout(timeout):
+    """Срок жизни ключа, не дольше чем до ближайшей отложенной публикации.
+
+    В этот момент страницы и счётчики постов должны учесть новый пост.
+    """
+    cache = get_cache(page_cache_alias())
+    key = make_key(
+        PAGE_CACHE_NAMESPACE, 'next_publication', using=page_cache_alias()
+    )
+    now = timezone.now()
+    next_publication = cache.get(key)
+    if next_publication is None or (
+        next_publication and next_publication <= now
+    ):
+        next_publication = next_scheduled_publication() or False
+        cache.set(key, next_publication, timeout)
+    if next_publication:
+        timeout = min(
+            timeout, math.ceil((next_publication - now).total_seconds())
+        )
+    return timeout
+
+
+def page_cache_timeout():
+    """Время жизни страницы в кеше."""
+    return publication_timeout(getattr(settings, 'PAGE_CACHE_TIMEOUT', 300))
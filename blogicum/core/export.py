@@ -0,0 +1,72 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from blog.const import EXPORT_CHUNK_SIZE
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+# Строки склеиваются в блоки примерно такого размера: отдавать клиенту
+# по строке слишком накладно, а блок целиком в памяти не страшен.
+EXPORT_BLOCK_SIZE = 64 * 1024
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def export_fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def iter_export_lines(queryset, export_format, chunk_size=None):
+    """Строки выгрузки ``queryset`` по одной.
+
+    Строки читаются из курсора пачками через ``iterator()``, поэтому
+    память не зависит от размера таблицы.
+    """
+    fields = export_fields(queryset.model)
+    rows = (
+        queryset.order_by('pk')
+        .values_list(*fields)
+        .iterator(chunk_size=chunk_size or EXPORT_CHUNK_SIZE)
+    )
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def iter_export(queryset, export_format, chunk_size=None):
+    """Выгрузка блоками по EXPORT_BLOCK_SIZE символов."""
+    block, size = [], 0
+    for line in iter_export_lines(queryset, export_format, chunk_size):
+        block.append(line)
+        size += len(line)
+        if size >= EXPORT_BLOCK_SIZE:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
+
+
+def export_response(queryset, export_format, filename):
+    response = StreamingHttpResponse(
+        iter_export(queryset, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
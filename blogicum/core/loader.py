@@ -0,0 +1,269 @@
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from blog.const import BULK_CHUNK_SIZE
+from blog.models import Post
+from .services import recount_comments
+
+READ_SIZE = 1024 * 1024
+# Порядок вставки: сначала модели, на которые ссылаются остальные.
+LOAD_ORDER = (
+    'auth.group',
+    'auth.user',
+    'blog.category',
+    'blog.location',
+    'blog.post',
+    'blog.comment',
+)
+
+_whitespace = re.compile(r'\s*')
+
+
+class JSONStreamReader:
+    """Буфер над файлом, который дочитывается по мере разбора."""
+
+    def __init__(self, file, read_size=READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+
+    def read_more(self):
+        chunk = self.file.read(self.read_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Следующий непробельный символ или None в конце файла."""
+        while True:
+            self.position = _whitespace.match(
+                self.buffer, self.position
+            ).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return None
+
+    def decode(self):
+        while True:
+            try:
+                obj, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return obj
+            except json.JSONDecodeError:
+                # Объект не дочитан: добавить следующий кусок и повторить.
+                if not self.read_more():
+                    raise
+
+
+def iter_json_array(file, read_size=READ_SIZE):
+    """Объекты JSON-массива из файла по одному, без чтения файла целиком.
+
+    Формат — как у ``dumpdata``: массив объектов верхнего уровня.
+    """
+    reader = JSONStreamReader(file, read_size)
+    char = reader.peek()
+    if char is None:
+        return
+    if char != '[':
+        raise ValueError('Ожидался JSON-массив')
+    reader.position += 1
+    while True:
+        char = reader.peek()
+        if char is None:
+            raise ValueError('Неожиданный конец файла')
+        if char == ']':
+            return
+        if char == ',':
+            reader.position += 1
+            continue
+        yield reader.decode()
+
+
+def iter_json_lines(file):
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def auto_date_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField)
+        and (field.auto_now or field.auto_now_add)
+    ]
+
+
+@contextmanager
+def file_dates(model_list):
+    """Выключить auto_now и auto_now_add на время загрузки.
+
+    Иначе bulk_create затрёт даты из файла, как не затирает их loaddata
+    в режиме raw. Флаги полей общие для процесса, поэтому загрузку не
+    стоит запускать рядом с обработкой запросов.
+    """
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in model_list
+        for field in auto_date_fields(model)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BlogLoader:
+    """Пакетная загрузка фикстур блога.
+
+    Объекты копятся в буферах по моделям и вставляются через bulk_create
+    пачками в порядке LOAD_ORDER, связи многие-ко-многим — строками
+    промежуточных моделей. Вся загрузка идёт в одной транзакции: ссылки
+    на объекты из следующих пачек проверяются при её завершении, а
+    ошибка не оставляет данные загруженными наполовину. Сигналы моделей
+    не отправляются; comment_count пересчитывается в конце для постов с
+    загруженными комментариями.
+    """
+
+    def __init__(self, batch_size, using='default'):
+        self.batch_size = batch_size
+        self.using = using
+        self.models = {label: apps.get_model(label) for label in LOAD_ORDER}
+        self.date_fields = {
+            label: auto_date_fields(model)
+            for label, model in self.models.items()
+        }
+        self.buffers = {label: [] for label in LOAD_ORDER}
+        self.relations = defaultdict(list)
+        self.tables = set()
+        self.commented_posts = set()
+        self.buffered = 0
+        self.loaded = Counter()
+        self.skipped = Counter()
+        self.started = time.monotonic()
+
+    @property
+    def total(self):
+        return sum(self.loaded.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total / max(time.monotonic() - self.started, 1e-9)
+
+    def supported(self, records):
+        for record in records:
+            label = record.get('model', '').lower()
+            if label in self.buffers:
+                yield record
+            else:
+                self.skipped[label] += 1
+
+    def load(self, records):
+        with (
+            transaction.atomic(using=self.using),
+            file_dates(self.models.values()),
+        ):
+            for deserialized in Deserializer(
+                self.supported(records), using=self.using,
+                ignorenonexistent=True,
+            ):
+                self.add(deserialized.object, deserialized.m2m_data or {})
+                if self.buffered >= self.batch_size:
+                    self.flush()
+            self.flush()
+            self.check_constraints()
+            self.recount_comments()
+            self.reset_sequences()
+
+    def add(self, obj, m2m_data):
+        label = obj._meta.label_lower
+        self.fill_auto_dates(obj, self.date_fields[label])
+        self.buffers[label].append(obj)
+        self.buffered += 1
+        if label == 'blog.comment':
+            self.commented_posts.add(obj.post_id)
+        for name, values in m2m_data.items():
+            field = obj._meta.get_field(name)
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(
+                field.m2m_reverse_field_name()
+            ).attname
+            self.relations[through].extend(
+                through(**{source: obj.pk, target: value})
+                for value in values
+            )
+            self.buffered += len(values)
+
+    @staticmethod
+    def fill_auto_dates(obj, fields):
+        # Пропущенные в файле даты заполняются, как при сохранении.
+        for field in fields:
+            if getattr(obj, field.attname) is None:
+                now = timezone.now()
+                setattr(obj, field.attname, (
+                    now if isinstance(field, models.DateTimeField)
+                    else now.date()
+                ))
+
+    def flush(self):
+        if not self.buffered:
+            return
+        for label, objs in self.buffers.items():
+            if objs:
+                self.insert(self.models[label], objs)
+                self.loaded[label] += len(objs)
+                objs.clear()
+        for through, rows in self.relations.items():
+            self.insert(through, rows)
+        self.relations.clear()
+        self.buffered = 0
+
+    def insert(self, model, objs):
+        model._base_manager.using(self.using).bulk_create(
+            objs, batch_size=self.batch_size
+        )
+        self.tables.add(model._meta.db_table)
+
+    def check_constraints(self):
+        # Как loaddata: отложенные ссылки проверяются сразу, а не при
+        # фиксации внешней транзакции.
+        connections[self.using].check_constraints(
+            table_names=sorted(self.tables)
+        )
+
+    def recount_comments(self):
+        post_ids = sorted(self.commented_posts)
+        posts = Post.objects.using(self.using)
+        for start in range(0, len(post_ids), BULK_CHUNK_SIZE):
+            recount_comments(posts.filter(
+                pk__in=post_ids[start:start + BULK_CHUNK_SIZE]
+            ))
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [self.models[label] for label in self.loaded]
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
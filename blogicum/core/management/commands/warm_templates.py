@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Компилирует все шаблоны из templates/ заранее.'
+
+    def handle(self, *args, **options):
+        compiled = warm_templates()
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {compiled}'
+        ))
@@ -0,0 +1,271 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        (name, value.replace('\\', r'\\').replace('"', r'\"')
+         .replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class Metric:
+    """Метрика с метками; значения по наборам меток под блокировкой."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.reset()
+
+    def reset(self):
+        # Новая блокировка: после fork старая может остаться занятой.
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def dump(self):
+        """Значения в виде, пригодном для JSON: [[метки, значение], ...]."""
+        with self.lock:
+            return [
+                [list(key), self.copy(value)]
+                for key, value in self.values.items()
+            ]
+
+    def copy(self, value):
+        return value
+
+    def render(self, series):
+        yield f'# HELP {self.name} {self.documentation}\n'
+        yield f'# TYPE {self.name} {self.kind}\n'
+        for key, value in sorted(series.items()):
+            yield from self.samples(list(zip(self.labelnames, key)), value)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, value, other):
+        return value + other
+
+    def samples(self, labels, value):
+        yield f'{self.name}{format_labels(labels)} {format_value(value)}\n'
+
+
+class Histogram(Metric):
+    """Гистограмма: значение — число наблюдений по корзинам и их сумма."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        self.buckets = (*buckets, math.inf)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, amount, **labels):
+        key = self.key(labels)
+        index = bisect_left(self.buckets, amount)
+        with self.lock:
+            value = self.values.get(key)
+            if value is None:
+                value = self.values[key] = [0] * len(self.buckets) + [0]
+            value[index] += 1
+            value[-1] += amount
+
+    def copy(self, value):
+        return list(value)
+
+    def merge(self, value, other):
+        return [first + second for first, second in zip(value, other)]
+
+    def samples(self, labels, value):
+        total = 0
+        for bound, count in zip(self.buckets, value):
+            total += count
+            bucket_labels = format_labels(
+                [*labels, ('le', format_value(bound))]
+            )
+            yield f'{self.name}_bucket{bucket_labels} {total}\n'
+        labels = format_labels(labels)
+        yield f'{self.name}_sum{labels} {format_value(value[-1])}\n'
+        yield f'{self.name}_count{labels} {total}\n'
+
+
+def metrics_directory():
+    return getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+
+
+class Registry:
+    """Метрики процесса и их вывод в текстовом формате Prometheus.
+
+    В режиме нескольких процессов (METRICS_MULTIPROCESS_DIR) каждый
+    процесс пишет свои значения в отдельный файл каталога, а вывод
+    складывает файлы всех процессов, в том числе завершившихся.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.reset()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+        self.flush_lock = threading.Lock()
+        self.flushed = 0.0
+        # Имя файла процесса: pid после перезапуска может повториться.
+        self.filename = f'{os.getpid()}-{uuid4().hex[:8]}.json'
+
+    def dump(self):
+        return {name: metric.dump() for name, metric in self.metrics.items()}
+
+    def flush(self, directory):
+        """Атомарно заменить файл процесса его текущими значениями."""
+        directory = Path(directory)
+        with self.flush_lock:
+            directory.mkdir(parents=True, exist_ok=True)
+            temporary = directory / f'.{self.filename}.tmp'
+            temporary.write_text(json.dumps(self.dump()), encoding='utf-8')
+            os.replace(temporary, directory / self.filename)
+            self.flushed = time.monotonic()
+
+    def maybe_flush(self):
+        directory = metrics_directory()
+        if directory is not None and time.monotonic() - self.flushed >= (
+            getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        ):
+            self.flush(directory)
+
+    def states(self):
+        directory = metrics_directory()
+        if directory is None:
+            return [self.dump()]
+        self.flush(directory)
+        states = []
+        for path in Path(directory).glob('*.json'):
+            try:
+                states.append(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                continue
+        return states
+
+    def collect(self):
+        """Значения, сложенные по всем процессам: {имя: {метки: значение}}."""
+        merged = {name: {} for name in self.metrics}
+        for state in self.states():
+            for name, series in state.items():
+                if name not in self.metrics:
+                    continue
+                metric, target = self.metrics[name], merged[name]
+                for labels, value in series:
+                    key = tuple(labels)
+                    target[key] = (
+                        metric.merge(target[key], value)
+                        if key in target else value
+                    )
+        return merged
+
+    def render(self):
+        merged = self.collect()
+        return ''.join(
+            line
+            for name, metric in self.metrics.items()
+            for line in metric.render(merged[name])
+        )
+
+
+REGISTRY = Registry()
+
+request_duration = REGISTRY.register(Histogram(
+    'blogicum_http_request_duration_seconds',
+    'Время ответа по имени URL и статусу.',
+    ('view', 'status'),
+    LATENCY_BUCKETS,
+))
+request_queries = REGISTRY.register(Histogram(
+    'blogicum_db_queries_per_request',
+    'Число SQL-запросов на один HTTP-запрос.',
+    ('view',),
+    QUERY_BUCKETS,
+))
+cache_lookups = REGISTRY.register(Counter(
+    'blogicum_cache_lookups_total',
+    'Обращения к кешу по пространству ключей: попадания и промахи.',
+    ('cache', 'result'),
+))
+writes = REGISTRY.register(Counter(
+    'blogicum_writes_total',
+    'Создание, изменение и удаление публикаций и комментариев.',
+    ('model', 'action'),
+))
+
+# Значения родителя, унаследованные при fork, уже учтены в его файле.
+os.register_at_fork(after_in_child=REGISTRY.reset)
+
+
+@atexit.register
+def _flush_on_exit():
+    directory = metrics_directory()
+    if directory is not None:
+        REGISTRY.flush(directory)
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper: только число запросов."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def record_request(view, status, duration, queries):
+    request_duration.observe(duration, view=view, status=status)
+    request_queries.observe(queries, view=view)
+    REGISTRY.maybe_flush()
+
+
+def record_cache_lookup(cache, hit):
+    cache_lookups.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def record_write(model, action, amount=1):
+    writes.inc(amount, model=model, action=action)
@@ -0,0 +1,277 @@
+import cProfile
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import QueryCounter, record_request
+from .nplusone import QueryPatterns, detection_settings, report_repeated
+from .profiling import (
+    PROFILE_HEADER, PROFILE_PARAM, StackSampler, get_profile_store,
+    profiling_allowed, request_thread,
+)
+from .slow_queries import (
+    current_view, slow_query_threshold, slow_query_wrapper,
+)
+
+logger = logging.getLogger(__name__)
+
+# Замеры текущего запроса; None, если запрос не попал в выборку.
+_current = ContextVar('performance_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.template_depth = 0
+        self.view_started = None
+        self.view = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper: время и число запросов."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    def view_finished(self):
+        if self.view_started is not None and self.view is None:
+            self.view = time.perf_counter() - self.view_started
+
+    def server_timing(self, total, size):
+        metrics = [
+            f'db;dur={self.sql * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+        ]
+        if self.view is not None:
+            metrics.append(f'view;dur={self.view * 1000:.1f}')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        if size is not None:
+            metrics.append(f'size;desc="{size}"')
+        return ', '.join(metrics)
+
+
+def timed_render(render, *args):
+    """Вызвать ``render`` и учесть его время в замерах запроса.
+
+    Вызывается шаблонами core.template_backends.TimedDjangoTemplates.
+    """
+    timings = _current.get()
+    if timings is None:
+        return render(*args)
+    # Вложенный рендер (render_to_string внутри шаблона) уже учтён
+    # во внешнем.
+    timings.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return render(*args)
+    finally:
+        timings.template_depth -= 1
+        if not timings.template_depth:
+            timings.template += time.perf_counter() - started
+
+
+def sample_rate():
+    return getattr(settings, 'PERFORMANCE_SAMPLE_RATE', 0.0)
+
+
+class PerformanceMiddleware:
+    """Замеры запроса: SQL, представление, шаблоны и размер ответа.
+
+    Для доли запросов PERFORMANCE_SAMPLE_RATE замеры уходят в заголовок
+    Server-Timing и в строку журнала ``core.middleware`` в формате JSON.
+    Остальные запросы проходят без обёрток. Ставится первым в
+    MIDDLEWARE, чтобы total охватывал все остальные. Время шаблонов
+    замеряет бэкенд core.template_backends.TimedDjangoTemplates.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = sample_rate()
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        timings.view_finished()
+        self.report(request, response, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Представление отдало TemplateResponse: дальше только рендер.
+        timings = _current.get()
+        if timings is not None:
+            timings.view_finished()
+        return response
+
+    def report(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = timings.server_timing(total, size)
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'view_ms': (
+                None if timings.view is None
+                else round(timings.view * 1000, 2)
+            ),
+            'template_ms': round(timings.template * 1000, 2),
+            'sql_ms': round(timings.sql * 1000, 2),
+            'queries': timings.queries,
+            'bytes': size,
+        }
+        logger.info(
+            json.dumps(record, ensure_ascii=False),
+            extra={'performance': record},
+        )
+
+
+class ProfilingMiddleware:
+    """Профилирование отдельного запроса по подписанному токену.
+
+    Токен сотрудника (страница ``core:profiles``) передаётся параметром
+    ``__profile`` или заголовком ``X-Profile``. Запрос выполняется под
+    cProfile, параллельно снимаются стеки для flamegraph; имя
+    сохранённого профиля возвращается в заголовке ``X-Profile``.
+    Ставится после AuthenticationMiddleware.
+
+    Кроме того, отмечает поток запроса для фонового профайлера.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_thread():
+            return self.handle(request)
+
+    def handle(self, request):
+        token = (
+            request.GET.get(PROFILE_PARAM)
+            or request.headers.get(PROFILE_HEADER)
+        )
+        if not token or not profiling_allowed(request.user, token):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        sampler = StackSampler(
+            getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.001),
+            threading.get_ident(),
+        )
+        sampler.start()
+        try:
+            response = profiler.runcall(self.get_response, request)
+        finally:
+            sampler.stop()
+        match = getattr(request, 'resolver_match', None)
+        response[PROFILE_HEADER] = get_profile_store().save(
+            profiler, sampler.snapshot(),
+            match.view_name if match else request.path,
+        )
+        return response
+
+
+class QueryLogMiddleware:
+    """Журнал медленных запросов: обёртка соединений на время запроса.
+
+    Если SLOW_QUERY_THRESHOLD задан, запросы к БД идут через
+    slow_query_wrapper; имя представления попадает в записи журнала.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_view.set(None)
+        try:
+            with ExitStack() as stack:
+                if slow_query_threshold() is not None:
+                    for connection in connections.all():
+                        stack.enter_context(
+                            connection.execute_wrapper(slow_query_wrapper)
+                        )
+                return self.get_response(request)
+        finally:
+            current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_view.set(request.resolver_match.view_name)
+
+
+class DuplicateQueryMiddleware:
+    """Поиск N+1: одинаковые запросы, повторённые в одном запросе.
+
+    Проверяется доля NPLUSONE_SAMPLE_RATE запросов, в строгом режиме
+    NPLUSONE_STRICT — все, и найденное поднимает DuplicateQueriesError.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate, threshold, strict = detection_settings()
+        if not strict and (not rate or random.random() >= rate):
+            return self.get_response(request)
+        patterns = QueryPatterns(threshold)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(patterns))
+            response = self.get_response(request)
+        repeated = patterns.repeated()
+        if repeated:
+            report_repeated(request, repeated, strict)
+        return response
+
+
+class MetricsMiddleware:
+    """Время ответа и число SQL-запросов каждого запроса для /metrics.
+
+    Ставится сразу после PerformanceMiddleware, чтобы время охватывало
+    остальные промежуточные слои.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        record_request(
+            match.view_name if match else '',
+            response.status_code,
+            time.perf_counter() - started,
+            queries.count,
+        )
+        return response
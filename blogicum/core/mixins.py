@@ -1,14 +1,88 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import redirect
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 
+from blog.const import COMMENTS_PER_PAGE
 from blog.models import Comment, Post
 from blog.forms import PostForm
+from .caching import (
+    PAGE_CACHE_NAMESPACE,
+    POST_CARD_NAMESPACE,
+    get_cache,
+    get_version,
+    page_cache_alias,
+    page_cache_key,
+    page_cache_timeout,
+)
+from .metrics import record_cache_lookup
+from .paginators import CountProvider, InvalidCursor, KeysetPaginator
 
 
-class AuthorCheckMixin(UserPassesTestMixin):
+class IdentityMap:
+    """Объекты моделей, уже загруженные в рамках одного запроса.
+
+    Поиск по простым полям (без ``__``) сначала идёт по загруженным
+    объектам, поэтому каждая строка читается из БД не больше одного раза.
+    """
+
+    def __init__(self):
+        self._objects = {}
+
+    def add(self, obj):
+        self._objects[(obj._meta.label, obj.pk)] = obj
+        return obj
+
+    def find(self, model, **lookup):
+        if any('__' in field for field in lookup):
+            return None
+        label = model._meta.label
+        for (obj_label, _), obj in self._objects.items():
+            if obj_label == label and all(
+                getattr(obj, field) == value
+                for field, value in lookup.items()
+            ):
+                return obj
+        return None
+
+    def get_or_404(self, model, loader=None, **lookup):
+        obj = self.find(model, **lookup)
+        if obj is None:
+            if loader is None:
+                obj = get_object_or_404(model, **lookup)
+            else:
+                obj = loader()
+            self.add(obj)
+        return obj
+
+
+def get_identity_map(request):
+    if not hasattr(request, 'identity_map'):
+        request.identity_map = IdentityMap()
+        if request.user.is_authenticated:
+            request.identity_map.add(request.user)
+    return request.identity_map
+
+
+class IdentityMapMixin:
+    @property
+    def identity_map(self):
+        return get_identity_map(self.request)
+
+
+class AuthorCheckMixin(IdentityMapMixin, UserPassesTestMixin):
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        return self.identity_map.get_or_404(
+            self.model,
+            loader=super().get_object,
+            pk=int(self.kwargs[self.pk_url_kwarg]),
+        )
+
     def test_func(self):
-        return self.request.user == self.get_object().author
+        return self.request.user.pk == self.get_object().author_id
 
 
 class PostMixin(AuthorCheckMixin, LoginRequiredMixin):
@@ -38,3 +112,132 @@ class CommentMixin(LoginRequiredMixin):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class CursorPaginationMixin:
+    """Пагинация ListView по курсору (pub_date, id).
+
+    Без параметра ``cursor`` страницы выбираются по номеру, с ним — по
+    ключу; номер страницы в этом случае используется только для вывода.
+    """
+
+    paginator_class = KeysetPaginator
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if not cursor:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        try:
+            number = int(self.request.GET.get(self.page_kwarg, ''))
+        except ValueError:
+            number = None
+        try:
+            page = paginator.cursor_page(cursor, number)
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountMixin:
+    """Число объектов для пагинатора ListView берётся из кеша.
+
+    Считается по ``get_count_queryset`` — по умолчанию это сам
+    ``get_queryset``, а наследник может задать выборку без тяжёлых
+    аннотаций; ``get_count_key`` — части ключа кеша.
+    """
+
+    allow_count_estimate = False
+
+    def get_count_queryset(self):
+        return self.get_queryset()
+
+    def get_count_key(self):
+        return (type(self).__name__,)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        kwargs.setdefault('count_provider', CountProvider(
+            self.get_count_queryset(),
+            self.get_count_key(),
+            allow_estimate=self.allow_count_estimate,
+        ))
+        return super().get_paginator(queryset, per_page, **kwargs)
+
+
+class AnonymousPageCacheMixin:
+    """Кеш готовых страниц для анонимных читателей.
+
+    Включается настройкой PAGE_CACHE_ENABLED; сбрасывается сигналами
+    сохранения и удаления публикаций, комментариев, категорий и мест.
+    """
+
+    def page_cache_applies(self, request):
+        return (
+            getattr(settings, 'PAGE_CACHE_ENABLED', False)
+            and request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.page_cache_applies(request):
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_cache(page_cache_alias())
+        key = page_cache_key(request)
+        response = cache.get(key)
+        record_cache_lookup(PAGE_CACHE_NAMESPACE, response is not None)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or response.cookies:
+            return response
+        timeout = page_cache_timeout()
+        if timeout <= 0:
+            return response
+
+        def store(response):
+            cache.set(key, response, timeout)
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+        return response
+
+
+class PostCardCacheMixin:
+    """Данные для кеширования карточек постов в includes/post_card.html.
+
+    Ключ карточки складывается из id, updated_at и comment_count поста;
+    общее поколение сбрасывается при изменении категорий и мест.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_card_version'] = get_version(POST_CARD_NAMESPACE)
+        context['post_card_timeout'] = getattr(
+            settings, 'POST_CARD_CACHE_TIMEOUT', 3600
+        )
+        return context
+
+
+class CommentPageMixin:
+    """Комментарии поста порциями по курсору (created_at, id)."""
+
+    comments_per_page = COMMENTS_PER_PAGE
+
+    def get_comments_page(self, post, cursor=None):
+        paginator = KeysetPaginator(
+            post.comments.select_related('author'),
+            self.comments_per_page,
+            ordering=('created_at', 'pk'),
+        )
+        try:
+            return paginator.cursor_page(cursor)
+        except InvalidCursor as e:
+            raise Http404(str(e))
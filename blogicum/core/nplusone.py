@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+import django.template
+from django.conf import settings
+
+from .slow_queries import query_origin
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.dirname(django.template.__file__) + os.sep
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+\b|%s")
+_in_lists = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+
+class DuplicateQueriesError(Exception):
+    """Повторяющиеся запросы в строгом режиме NPLUSONE_STRICT."""
+
+
+def normalize_sql(sql):
+    """SQL без значений: запросы, отличающиеся только ими, совпадут."""
+    return _in_lists.sub('(...)', _literals.sub('?', sql))
+
+
+def rendering_template(frame):
+    """Имя шаблона, узел которого сейчас рендерится, или None."""
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(TEMPLATE_DIR):
+            origin = getattr(frame.f_locals.get('self'), 'origin', None)
+            if origin is not None:
+                return origin.template_name
+        frame = frame.f_back
+    return None
+
+
+class QueryPatterns:
+    """Обёртка execute_wrapper: считает SELECT по нормализованному SQL.
+
+    Когда шаблон запроса повторяется ``threshold`` раз, запоминается,
+    откуда он пришёл: шаблон и кадры blog/ и core/.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            pattern = normalize_sql(sql)
+            self.counts[pattern] += 1
+            if self.counts[pattern] == self.threshold:
+                frame = sys._getframe(1)
+                self.origins[pattern] = {
+                    'template': rendering_template(frame),
+                    'origin': query_origin(frame),
+                }
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        return [
+            {'sql': pattern, 'count': count, **self.origins[pattern]}
+            for pattern, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+
+def detection_settings():
+    return (
+        getattr(settings, 'NPLUSONE_SAMPLE_RATE', 0.0),
+        getattr(settings, 'NPLUSONE_THRESHOLD', 5),
+        getattr(settings, 'NPLUSONE_STRICT', False),
+    )
+
+
+def report_repeated(request, repeated, strict):
+    match = getattr(request, 'resolver_match', None)
+    record = {
+        'view': match.view_name if match else None,
+        'path': request.path,
+        'patterns': repeated,
+    }
+    message = json.dumps(record, ensure_ascii=False)
+    logger.warning(message)
+    if strict:
+        raise DuplicateQueriesError(message)
@@ -0,0 +1,272 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import make_key, publication_timeout
+from .metrics import record_cache_lookup
+from .services import estimate_row_count
+
+POST_COUNT_NAMESPACE = 'post_count'
+# Курсор последней страницы: она выбирается с конца, без OFFSET.
+LAST_CURSOR = 'last'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CountProvider:
+    """Кешированное число строк для пагинатора.
+
+    Точное значение считается по ``queryset`` без аннотаций и хранится в
+    кеше под ``key``. Если разрешена оценка и таблица больше порога,
+    вместо COUNT(*) берётся оценка по статистике планировщика.
+    """
+
+    def __init__(self, queryset, key, allow_estimate=False,
+                 namespace=POST_COUNT_NAMESPACE):
+        self.queryset = queryset
+        self.key = key
+        self.allow_estimate = allow_estimate
+        self.namespace = namespace
+
+    @property
+    def timeout(self):
+        return publication_timeout(
+            getattr(settings, 'POST_COUNT_CACHE_TIMEOUT', 60)
+        )
+
+    @property
+    def estimate_threshold(self):
+        return getattr(settings, 'POST_COUNT_ESTIMATE_THRESHOLD', 100_000)
+
+    def estimate(self):
+        if not self.allow_estimate:
+            return None
+        estimate = estimate_row_count(self.queryset.model)
+        if estimate is None or estimate < self.estimate_threshold:
+            return None
+        return estimate
+
+    def count(self):
+        key = make_key(self.namespace, *self.key)
+        value = cache.get(key)
+        record_cache_lookup(self.namespace, value is not None)
+        if value is None:
+            value = self.estimate()
+            if value is None:
+                value = self.queryset.order_by().count()
+            cache.set(key, value, self.timeout)
+        return value
+
+    def exact_count(self):
+        """Точное число строк взамен оценки или устаревшего значения."""
+        value = self.queryset.order_by().count()
+        cache.set(make_key(self.namespace, *self.key), value, self.timeout)
+        return value
+
+
+class ElidedPage(Page):
+    """Страница с сокращённым списком номеров для шаблона пагинатора."""
+
+    next_cursor = previous_cursor = None
+
+    @property
+    def elided_page_range(self):
+        """Номера страниц вокруг текущей и по краям, с многоточиями."""
+        try:
+            return list(self.paginator.get_elided_page_range(
+                self.number,
+                on_each_side=self.paginator.on_each_side,
+                on_ends=self.paginator.on_ends,
+            ))
+        except InvalidPage:
+            return [self.number]
+
+
+class ElidedPaginator(Paginator):
+    """Номерной пагинатор для выборок, где курсор неприменим.
+
+    Например, для результатов поиска, отсортированных по релевантности.
+    """
+
+    on_each_side = 2
+    on_ends = 1
+
+    def _get_page(self, *args, **kwargs):
+        return ElidedPage(*args, **kwargs)
+
+
+class KeysetPage(ElidedPage):
+    """Страница с курсорами на соседние страницы."""
+
+    @property
+    def next_cursor(self):
+        if not self.object_list or not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.object_list or not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self[0], backward=True)
+
+
+class CursorPage(KeysetPage):
+    """Страница, выбранная по курсору, без OFFSET и COUNT."""
+
+    def __init__(self, object_list, number, paginator, has_next,
+                 has_previous):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1 if self.number else None
+
+    def previous_page_number(self):
+        return self.number - 1 if self.number else None
+
+    def start_index(self):
+        if not self.number:
+            return None
+        return super().start_index()
+
+    def end_index(self):
+        if not self.number:
+            return None
+        return super().end_index()
+
+
+class KeysetPaginator(ElidedPaginator):
+    """Пагинатор по ключу сортировки, по умолчанию — (pub_date, id).
+
+    Номерные страницы работают как у обычного Paginator, а страницы по
+    курсору выбираются условием на ключ, поэтому их стоимость не зависит
+    от глубины.
+    """
+
+    ordering = ('-pub_date', '-pk')
+    last_cursor = LAST_CURSOR
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, error_messages=None,
+                 ordering=None, count_provider=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.count_provider = count_provider
+        super().__init__(
+            object_list.order_by(*self.ordering),
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            error_messages,
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return KeysetPage(*args, **kwargs)
+
+    def page(self, number):
+        """Страница по номеру; пустая — значит, число строк завышено.
+
+        Оценка по статистике считает всю таблицу, а не видимые посты, да
+        и кешированное число могло устареть. Тогда число пересчитывается
+        точно и возвращается последняя настоящая страница.
+        """
+        page = super().page(number)
+        if page.object_list or page.number == 1 or not self.count_provider:
+            return page
+        self.count = self.count_provider.exact_count()
+        self.__dict__.pop('num_pages', None)
+        return super().page(min(page.number, self.num_pages))
+
+    @cached_property
+    def count(self):
+        if self.count_provider is None:
+            return super().count
+        return self.count_provider.count()
+
+    @property
+    def keys(self):
+        return [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+
+    def _get_field(self, name):
+        opts = self.object_list.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, obj, backward=False):
+        values = [
+            self._get_field(name).value_to_string(obj)
+            for name, _ in self.keys
+        ]
+        payload = json.dumps([int(backward), *values])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            backward, *raw_values = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            if len(raw_values) != len(self.keys):
+                raise ValueError
+            values = [
+                self._get_field(name).to_python(value)
+                for (name, _), value in zip(self.keys, raw_values)
+            ]
+        except Exception:
+            raise InvalidCursor('Некорректный курсор')
+        return bool(backward), values
+
+    def _seek(self, values, backward):
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending != backward else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def cursor_page(self, cursor, number=None):
+        """Вернуть страницу, следующую за курсором (или предшествующую).
+
+        Без курсора возвращается первая страница, тоже без COUNT(*), а с
+        LAST_CURSOR — последние ``per_page`` строк. Устаревший курсор, за
+        которым строк нет, даёт пустую страницу без ссылок на соседние.
+        """
+        if not cursor:
+            rows = list(self.object_list[:self.per_page + 1])
+            return CursorPage(
+                rows[:self.per_page], number or 1, self,
+                len(rows) > self.per_page, False,
+            )
+        if cursor == LAST_CURSOR:
+            backward, queryset, last = True, self.object_list, True
+        else:
+            backward, values = self.decode_cursor(cursor)
+            queryset = self.object_list.filter(self._seek(values, backward))
+            last = False
+        if backward:
+            queryset = queryset.reverse()
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backward:
+            rows.reverse()
+            return CursorPage(
+                rows, number, self, bool(rows) and not last, has_more
+            )
+        return CursorPage(rows, number, self, has_more, bool(rows))
@@ -0,0 +1,258 @@
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_PARAM = '__profile'
+PROFILE_HEADER = 'X-Profile'
+TOKEN_SALT = 'core.profiling'
+PROFILE_SUFFIXES = ('.prof', '.collapsed')
+OTHER_STACK = '(other)'
+
+
+def make_profile_token(user):
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def profiling_allowed(user, token):
+    """Токен подписан для этого пользователя, не истёк, и он сотрудник."""
+    if not user.is_authenticated or not user.is_staff:
+        return False
+    try:
+        pk = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token,
+            max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600),
+        )
+    except signing.BadSignature:
+        return False
+    return pk == str(user.pk)
+
+
+# id объекта кода -> (имя кадра, сам объект кода) в порядке последнего
+# использования. Ссылка на код не даёт id достаться другому объекту, а
+# размер ограничен: старые записи вытесняются, и их код освобождается.
+_frame_names = OrderedDict()
+_frame_names_lock = threading.Lock()
+
+
+def frame_name(frame, limit):
+    """Имя кадра ``модуль.функция``; ``limit`` — сколько имён помнить."""
+    code = frame.f_code
+    key = id(code)
+    entry = _frame_names.get(key)
+    if entry is not None:
+        _frame_names.move_to_end(key)
+        return entry[0]
+    name = f'{frame.f_globals.get("__name__", "?")}.{code.co_qualname}'
+    _frame_names[key] = (name, code)
+    while len(_frame_names) > limit:
+        _frame_names.popitem(last=False)
+    return name
+
+
+def stack_key(frame):
+    """Стек кадра как кортеж имён кадров, изнутри наружу.
+
+    Имена берутся из ограниченного кеша, так что ключи разных сэмплов
+    делят одни и те же строки и не зависят от вытеснения из кеша.
+    """
+    limit = getattr(settings, 'SAMPLING_PROFILER_MAX_FRAME_NAMES', 10_000)
+    names = []
+    with _frame_names_lock:
+        while frame is not None:
+            names.append(frame_name(frame, limit))
+            frame = frame.f_back
+    return tuple(names)
+
+
+def collapse_stack(key):
+    """Стек в формате collapsed для flamegraph: снаружи внутрь."""
+    if isinstance(key, str):
+        return key
+    return ';'.join(reversed(key))
+
+
+def iter_collapsed(stacks):
+    for stack, count in sorted(stacks.items()):
+        yield f'{stack} {count}\n'
+
+
+def write_collapsed(path, stacks):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.writelines(iter_collapsed(stacks))
+
+
+class StackSampler(threading.Thread):
+    """Поток, который раз в ``interval`` секунд снимает стеки потоков.
+
+    Снимает стек одного потока ``thread_id`` или всех, кроме себя.
+    Различных стеков хранится не больше ``max_stacks``, остальные
+    сэмплы считаются в OTHER_STACK.
+    """
+
+    def __init__(self, interval, thread_id=None, max_stacks=None):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def wanted(self, ident):
+        return self.thread_id is None or ident == self.thread_id
+
+    def sample(self):
+        own = threading.get_ident()
+        frames = sys._current_frames()
+        with self.lock:
+            for ident, frame in frames.items():
+                if ident != own and self.wanted(ident):
+                    self.add(stack_key(frame))
+            self.samples += 1
+
+    def add(self, stack):
+        if (
+            self.max_stacks is not None
+            and stack not in self.stacks
+            and len(self.stacks) >= self.max_stacks
+        ):
+            stack = OTHER_STACK
+        self.stacks[stack] += 1
+
+    def snapshot(self):
+        """Накопленные стеки в виде строк collapsed."""
+        with self.lock:
+            stacks = list(self.stacks.items())
+        collapsed = Counter()
+        for key, count in stacks:
+            collapsed[collapse_stack(key)] += count
+        return collapsed
+
+    def reset(self):
+        with self.lock:
+            self.stacks.clear()
+            self.samples = 0
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class RequestThreadSampler(StackSampler):
+    """Фоновый профайлер: стеки только потоков, занятых запросом.
+
+    Потоки отмечает ProfilingMiddleware через ``request_thread``.
+    """
+
+    def wanted(self, ident):
+        return ident in _request_threads
+
+
+_request_threads = set()
+_sampling_profiler = None
+
+
+def get_sampling_profiler():
+    return _sampling_profiler
+
+
+def start_sampling_profiler():
+    """Запустить фоновый профайлер процесса, если он ещё не запущен."""
+    global _sampling_profiler
+    if _sampling_profiler is None:
+        _sampling_profiler = RequestThreadSampler(
+            getattr(settings, 'SAMPLING_PROFILER_INTERVAL', 0.01),
+            max_stacks=getattr(
+                settings, 'SAMPLING_PROFILER_MAX_STACKS', 10_000
+            ),
+        )
+        _sampling_profiler.start()
+    return _sampling_profiler
+
+
+def stop_sampling_profiler():
+    global _sampling_profiler
+    if _sampling_profiler is not None:
+        _sampling_profiler.stop()
+        _sampling_profiler = None
+
+
+@contextmanager
+def request_thread():
+    """Отметить текущий поток для фонового профайлера на время запроса."""
+    if _sampling_profiler is None:
+        yield
+        return
+    ident = threading.get_ident()
+    _request_threads.add(ident)
+    try:
+        yield
+    finally:
+        _request_threads.discard(ident)
+
+
+class ProfileStore:
+    """Каталог профилей: пары ``<имя>.prof`` и ``<имя>.collapsed``.
+
+    Хранятся только ``keep`` последних профилей.
+    """
+
+    def __init__(self, directory, keep):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def save(self, profiler, stacks, label):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        label = re.sub(r'[^\w-]+', '-', label).strip('-') or 'request'
+        name = (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{label}-{uuid4().hex[:8]}'
+        )
+        profiler.dump_stats(self.directory / f'{name}.prof')
+        write_collapsed(self.directory / f'{name}.collapsed', stacks)
+        self.prune()
+        return name
+
+    def profiles(self):
+        """Профили от новых к старым."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            self.directory.glob('*.prof'),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+
+    def prune(self):
+        for path in self.profiles()[self.keep:]:
+            for suffix in PROFILE_SUFFIXES:
+                path.with_suffix(suffix).unlink(missing_ok=True)
+
+    def path(self, filename):
+        """Путь к файлу профиля или None для чужих и несуществующих имён."""
+        if (
+            Path(filename).name != filename
+            or Path(filename).suffix not in PROFILE_SUFFIXES
+        ):
+            return None
+        path = self.directory / filename
+        return path if path.is_file() else None
+
+
+def get_profile_store():
+    return ProfileStore(
+        getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'),
+        getattr(settings, 'PROFILING_KEEP', 50),
+    )
@@ -0,0 +1,108 @@
+import re
+
+from django.db import models
+
+POST_SEARCH_TABLE = 'blog_post_fts'
+
+# Внешнее содержимое: FTS5 хранит только индекс, текст берётся из
+# blog_post. Триггеры держат индекс в актуальном состоянии при любых
+# изменениях поста, в том числе при массовых update() и delete().
+POST_SEARCH_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {POST_SEARCH_TABLE} USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+POST_SEARCH_TRIGGERS_SQL = {
+    f'{POST_SEARCH_TABLE}_insert': (
+        f'AFTER INSERT ON blog_post BEGIN '
+        f'INSERT INTO {POST_SEARCH_TABLE}(rowid, title, text) '
+        f'VALUES (new.id, new.title, new.text); END'
+    ),
+    f'{POST_SEARCH_TABLE}_delete': (
+        f'AFTER DELETE ON blog_post BEGIN '
+        f'INSERT INTO {POST_SEARCH_TABLE}'
+        f'({POST_SEARCH_TABLE}, rowid, title, text) '
+        f"VALUES ('delete', old.id, old.title, old.text); END"
+    ),
+    f'{POST_SEARCH_TABLE}_update': (
+        f'AFTER UPDATE OF title, text ON blog_post BEGIN '
+        f'INSERT INTO {POST_SEARCH_TABLE}'
+        f'({POST_SEARCH_TABLE}, rowid, title, text) '
+        f"VALUES ('delete', old.id, old.title, old.text); "
+        f'INSERT INTO {POST_SEARCH_TABLE}(rowid, title, text) '
+        f'VALUES (new.id, new.title, new.text); END'
+    ),
+}
+
+
+def install_post_search(connection):
+    """Создать таблицу FTS5 и триггеры, если их нет.
+
+    SQLite теряет триггеры при пересоздании blog_post (так миграции
+    меняют столбцы), поэтому отсутствующие триггеры создаются заново,
+    а индекс перестраивается по таблице постов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'blog_post'"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = POST_SEARCH_TRIGGERS_SQL.keys() - existing
+        if not missing:
+            return
+        cursor.execute(POST_SEARCH_TABLE_SQL)
+        for name in missing:
+            cursor.execute(
+                f'CREATE TRIGGER {name} {POST_SEARCH_TRIGGERS_SQL[name]}'
+            )
+        cursor.execute(
+            f"INSERT INTO {POST_SEARCH_TABLE}({POST_SEARCH_TABLE}) "
+            "VALUES ('rebuild')"
+        )
+
+
+def uninstall_post_search(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in POST_SEARCH_TRIGGERS_SQL:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {POST_SEARCH_TABLE}')
+
+
+def search_words(text):
+    return re.findall(r'\w+', text)
+
+
+def fts_query(text, prefix=False):
+    """Запрос FTS5 из пользовательского ввода.
+
+    Каждое слово берётся в кавычки, чтобы операторы и спецсимволы FTS5
+    во вводе не ломали запрос; слова объединяются через AND. С
+    ``prefix`` последнее слово ищется по началу — для ввода, который ещё
+    набирают.
+    """
+    words = [f'"{word}"' for word in search_words(text)]
+    if prefix and words:
+        words[-1] += '*'
+    return ' '.join(words)
+
+
+class FullTextField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы — весь документ сразу.
+
+    Поддерживает только поиск ``field__match=query``.
+    """
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
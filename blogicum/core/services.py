@@ -1,21 +1,247 @@
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Count
 
+from blog.const import BULK_CHUNK_SIZE
+from blog.models import Comment, Post
+from .metrics import record_write
+from .search import fts_query, search_words
+from .signals import bulk_changed
 
-def annotate_with_comment_count(queryset):
-    return (
-        queryset.annotate(comment_count=Count('comments'))
-        .order_by('-pub_date')
-    ).select_related(
+
+def select_post_relations(queryset):
+    return queryset.order_by('-pub_date').select_related(
         'category',
         'location',
         'author',
     )
 
 
-def filter_published_posts(queryset):
-    return queryset.filter(
+def comment_count_subquery():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def recount_comments(posts):
+    """Пересчитать comment_count у постов из queryset ``posts``."""
+    return posts.update(comment_count=comment_count_subquery())
+
+
+def iter_pk_chunks(queryset, chunk_size=None):
+    """Первичные ключи ``queryset`` пачками по возрастанию.
+
+    Пачки выбираются по ключу, а не по смещению, поэтому выборку можно
+    менять и удалять по ходу обхода.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    chunk = list(pks[:chunk_size])
+    while chunk:
+        yield chunk
+        chunk = list(pks.filter(pk__gt=chunk[-1])[:chunk_size])
+
+
+def delete_rows(model, field, values, using):
+    """DELETE строк, у которых ``field`` из ``values``, одним запросом.
+
+    Идёт через курсор: без загрузки объектов, каскадов и сигналов.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.get_field(field).column)} '
+            f'IN ({placeholders})',
+            list(values),
+        )
+        return cursor.rowcount
+
+
+def record_bulk_write(model, action, amount):
+    """Учесть в метриках записи, прошедшие мимо сигналов save/delete."""
+    if amount and model in (Post, Comment):
+        record_write(model._meta.model_name, action, amount)
+
+
+def bulk_update(queryset, chunk_size=None, **values):
+    """UPDATE по пачкам ключей.
+
+    Сигналы save не отправляются, вместо них одно ``bulk_changed``.
+    """
+    manager = queryset.model._default_manager
+    updated = 0
+    for pks in iter_pk_chunks(queryset, chunk_size):
+        count = manager.filter(pk__in=pks).update(**values)
+        record_bulk_write(queryset.model, 'update', count)
+        updated += count
+    bulk_changed.send(sender=queryset.model)
+    return updated
+
+
+def bulk_update_posts(queryset, chunk_size=None, **values):
+    """Как bulk_update, но с новым updated_at — для кеша карточек."""
+    return bulk_update(
+        queryset, chunk_size, updated_at=timezone.now(), **values
+    )
+
+
+def bulk_delete_posts(queryset, chunk_size=None, before_delete=None):
+    """Удалить посты и их комментарии по пачкам без загрузки объектов.
+
+    ``before_delete`` вызывается с ключами каждой пачки внутри её
+    транзакции, до удаления; так же в остальных bulk_delete_*.
+    """
+    deleted = 0
+    for pks in iter_pk_chunks(queryset, chunk_size):
+        with transaction.atomic(using=queryset.db):
+            if before_delete is not None:
+                before_delete(pks)
+            comments = delete_rows(Comment, 'post', pks, queryset.db)
+            count = delete_rows(Post, 'id', pks, queryset.db)
+        record_bulk_write(Comment, 'delete', comments)
+        record_bulk_write(Post, 'delete', count)
+        deleted += count
+    bulk_changed.send(sender=Post)
+    return deleted
+
+
+def bulk_delete_comments(queryset, chunk_size=None, before_delete=None):
+    """Удалить комментарии по пачкам и пересчитать comment_count."""
+    deleted = 0
+    for pks in iter_pk_chunks(queryset, chunk_size):
+        with transaction.atomic(using=queryset.db):
+            if before_delete is not None:
+                before_delete(pks)
+            post_ids = set(
+                Comment.objects.filter(pk__in=pks)
+                .order_by()
+                .values_list('post_id', flat=True)
+            )
+            count = delete_rows(Comment, 'id', pks, queryset.db)
+            recount_comments(Post.objects.filter(pk__in=post_ids))
+        record_bulk_write(Comment, 'delete', count)
+        deleted += count
+    bulk_changed.send(sender=Comment)
+    return deleted
+
+
+def bulk_delete_categories(queryset, chunk_size=None, before_delete=None):
+    """Удалить категории по пачкам; посты остаются без категории."""
+    deleted = 0
+    for pks in iter_pk_chunks(queryset, chunk_size):
+        with transaction.atomic(using=queryset.db):
+            if before_delete is not None:
+                before_delete(pks)
+            posts = Post.objects.filter(category_id__in=pks).update(
+                category=None, updated_at=timezone.now()
+            )
+            deleted += delete_rows(queryset.model, 'id', pks, queryset.db)
+        record_bulk_write(Post, 'update', posts)
+    bulk_changed.send(sender=queryset.model)
+    return deleted
+
+
+def published_posts_q():
+    return Q(
         pub_date__lte=timezone.now(),
         is_published=True,
         category__is_published=True,
     )
+
+
+def filter_published_posts(queryset):
+    return queryset.filter(published_posts_q())
+
+
+def next_scheduled_publication():
+    """Время ближайшей отложенной публикации или None."""
+    return Post.objects.filter(
+        pub_date__gt=timezone.now(), is_published=True
+    ).aggregate(next=Min('pub_date'))['next']
+
+
+def get_visible_post_or_404(post_id, user):
+    """Пост со связанными объектами одним запросом.
+
+    Автор видит свой пост всегда, остальные — только опубликованный.
+    """
+    visible = published_posts_q()
+    if user.is_authenticated:
+        visible |= Q(author_id=user.pk)
+    return get_object_or_404(
+        Post.objects.select_related('category', 'location', 'author')
+        .filter(visible),
+        pk=post_id,
+    )
+
+
+def search_posts(queryset, text, prefix=False):
+    """Посты из ``queryset``, подходящие под запрос, по релевантности.
+
+    На SQLite поиск идёт по индексу FTS5 с ранжированием bm25, на других
+    СУБД — по вхождению всех слов в заголовок или текст. ``prefix`` см.
+    в fts_query.
+    """
+    query = fts_query(text, prefix)
+    if not query:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'sqlite':
+        condition = Q()
+        for word in search_words(text):
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition)
+    return queryset.filter(search_index__document__match=query).order_by(
+        'search_index__rank', '-pub_date', '-pk'
+    )
+
+
+def estimate_row_count(model):
+    """Оценка числа строк таблицы по статистике планировщика.
+
+    Возвращает None, если статистика не собрана или СУБД не поддерживается.
+    На SQLite берётся строка таблицы или полного индекса: частичный
+    индекс покрывает только часть строк.
+    """
+    table = model._meta.db_table
+    queries = {
+        'sqlite': (
+            'SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND ('
+            'idx IS NULL OR idx IN ('
+            'SELECT name FROM pragma_index_list(%s) WHERE NOT partial'
+            ')) LIMIT 1',
+            [table, table],
+        ),
+        'postgresql': (
+            'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+        ),
+    }
+    if connection.vendor not in queries:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(*queries[connection.vendor])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    return estimate if estimate > 0 else None
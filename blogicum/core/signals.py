@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Массовое изменение через UPDATE/DELETE, минуя сигналы моделей:
+# одно событие на всю операцию вместо сигнала на каждую строку.
+bulk_changed = Signal()
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Имя представления текущего запроса, его ставит QueryLogMiddleware.
+current_view = ContextVar('current_view', default=None)
+
+APP_DIRS = tuple(
+    os.path.join(settings.BASE_DIR, app) + os.sep for app in ('blog', 'core')
+)
+# Кадры самой инструментации в происхождение запроса не входят.
+SKIPPED_FILES = tuple(
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('slow_queries.py', 'middleware.py')
+)
+MAX_ORIGIN_FRAMES = 5
+MAX_PARAM_LENGTH = 200
+READ_BLOCK = 64 * 1024
+
+
+def slow_query_threshold():
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD', None)
+
+
+def query_origin(frame):
+    """Кадры из blog/ и core/, из которых пришёл запрос, изнутри наружу."""
+    origin = []
+    while frame is not None and len(origin) < MAX_ORIGIN_FRAMES:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIRS) and filename not in SKIPPED_FILES:
+            origin.append(
+                f'{os.path.relpath(filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno} in {frame.f_code.co_name}'
+            )
+        frame = frame.f_back
+    return origin
+
+
+def format_params(params, many):
+    if params is None or many:
+        return None
+    if isinstance(params, dict):
+        params = params.values()
+    return [repr(param)[:MAX_PARAM_LENGTH] for param in params]
+
+
+def explain(connection, sql, params):
+    """План запроса; курсор бэкенда минует execute_wrapper."""
+    prefix = connection.ops.explain_query_prefix()
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'{prefix} {sql}', params)
+        rows = cursor.fetchall()
+    except connection.Database.Error as error:
+        # Курсор бэкенда отдаёт исключения драйвера, а не Django.
+        return [f'EXPLAIN не выполнен: {error}']
+    finally:
+        cursor.close()
+    if connection.vendor != 'sqlite':
+        return [str(row[0]) for row in rows]
+    # Строки EXPLAIN QUERY PLAN: (id, parent, notused, detail).
+    depth = {0: -1}
+    plan = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        plan.append('  ' * depth[node] + detail)
+    return plan
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """Пишет в журнал запросы дольше SLOW_QUERY_THRESHOLD секунд."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        threshold = slow_query_threshold()
+        if threshold is not None and elapsed >= threshold:
+            log_slow_query(
+                context['connection'], sql, params, many, elapsed
+            )
+
+
+def log_slow_query(connection, sql, params, many, elapsed):
+    plan = None
+    if not many and sql.lstrip()[:6].upper() == 'SELECT':
+        plan = explain(connection, sql, params)
+    record = {
+        'time': timezone.now().isoformat(),
+        'view': current_view.get(),
+        'duration_ms': round(elapsed * 1000, 2),
+        'sql': sql,
+        'params': format_params(params, many),
+        'many': many,
+        'origin': query_origin(sys._getframe(2)),
+        'plan': plan,
+    }
+    logger.warning(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def tail_lines(path, count):
+    """Последние ``count`` строк файла без чтения его целиком."""
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return []
+    with file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(READ_BLOCK, position)
+            position -= step
+            file.seek(position)
+            data = file.read(step) + data
+    # Первая строка блока может быть обрезана, но при чтении с запасом
+    # она не попадает в последние count.
+    return list(deque(data.decode('utf-8', 'replace').splitlines(), count))
+
+
+def recent_slow_queries(count):
+    """Последние записи журнала медленных запросов, новые первыми."""
+    records = []
+    for line in reversed(tail_lines(
+        getattr(settings, 'SLOW_QUERY_LOG_FILE', None) or '', count
+    )):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
@@ -0,0 +1,23 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import timed_render
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        return timed_render(super().render, context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, шаблоны которого замеряют время рендера.
+
+    Время идёт в замеры PerformanceMiddleware; подключается в
+    TEMPLATES['BACKEND'].
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
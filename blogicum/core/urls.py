@@ -0,0 +1,28 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path(
+        'profiles/',
+        views.ProfileListView.as_view(),
+        name='profiles',
+    ),
+    path(
+        'samples/',
+        views.SampledStacksView.as_view(),
+        name='samples',
+    ),
+    path(
+        'slow-queries/',
+        views.SlowQueryListView.as_view(),
+        name='slow_queries',
+    ),
+    path(
+        'profiles/<str:filename>',
+        views.ProfileDownloadView.as_view(),
+        name='profile_download',
+    ),
+]
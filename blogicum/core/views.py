@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import redirect
+from django.views import View
+from django.views.generic import TemplateView
+
+from .metrics import CONTENT_TYPE, REGISTRY
+from .profiling import (
+    PROFILE_PARAM, get_profile_store, get_sampling_profiler, iter_collapsed,
+    make_profile_token,
+)
+from .slow_queries import recent_slow_queries
+
+
+class StaffRequiredMixin(UserPassesTestMixin):
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class ProfileListView(StaffRequiredMixin, TemplateView):
+    """Токен для профилирования и сохранённые профили запросов."""
+
+    template_name = 'core/profiles.html'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            token=make_profile_token(self.request.user),
+            param=PROFILE_PARAM,
+            profiles=[path.stem for path in get_profile_store().profiles()],
+            sampler=get_sampling_profiler(),
+            **kwargs,
+        )
+
+
+class ProfileDownloadView(StaffRequiredMixin, View):
+    def get(self, request, filename):
+        path = get_profile_store().path(filename)
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True)
+
+
+class SampledStacksView(StaffRequiredMixin, View):
+    """Накопленные фоновым профайлером стеки в формате collapsed.
+
+    POST очищает накопленное.
+    """
+
+    def get_sampler(self):
+        sampler = get_sampling_profiler()
+        if sampler is None:
+            raise Http404('Фоновый профайлер не запущен')
+        return sampler
+
+    def get(self, request):
+        response = HttpResponse(
+            iter_collapsed(self.get_sampler().snapshot()),
+            content_type='text/plain; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="samples.collapsed"'
+        )
+        return response
+
+    def post(self, request):
+        self.get_sampler().reset()
+        return redirect('core:profiles')
+
+
+class SlowQueryListView(StaffRequiredMixin, TemplateView):
+    """Последние записи журнала медленных запросов."""
+
+    template_name = 'core/slow_queries.html'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            records=recent_slow_queries(
+                getattr(settings, 'SLOW_QUERY_PAGE_SIZE', 100)
+            ),
+            threshold=getattr(settings, 'SLOW_QUERY_THRESHOLD', None),
+            **kwargs,
+        )
+
+
+class MetricsView(UserPassesTestMixin, View):
+    """Метрики в текстовом формате Prometheus.
+
+    Доступны сотрудникам и адресам из METRICS_ALLOWED_IPS, по умолчанию
+    пустого; сборщик метрик не входит на сайт, поэтому вместо
+    перенаправления — ответ 403.
+    """
+
+    raise_exception = True
+
+    def test_func(self):
+        return (
+            self.request.user.is_staff
+            or self.request.META.get('REMOTE_ADDR')
+            in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+        )
+
+    def get(self, request):
+        return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,38 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def iter_template_names(directory):
+    directory = Path(directory)
+    for path in sorted(directory.rglob('*')):
+        if path.is_file() and path.suffix in ('.html', '.txt'):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_templates():
+    """Скомпилировать шаблоны из TEMPLATES[*]['DIRS'].
+
+    С кеширующим загрузчиком первый запрос процесса уже не тратит время
+    на разбор шаблонов. Возвращает число скомпилированных шаблонов.
+    """
+    compiled = 0
+    for engine in engines.all():
+        for directory in engine.dirs:
+            for name in iter_template_names(directory):
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    logger.exception('Не удалось скомпилировать %s', name)
+                else:
+                    compiled += 1
+    return compiled
+
+
+def warm_templates_on_startup():
+    if getattr(settings, 'TEMPLATES_WARMUP', False):
+        warm_templates()
@@ -1,6 +1,7 @@
 import os
 import re
 import time
+from datetime import timedelta
 from http import HTTPStatus
 from inspect import getsource
 from pathlib import Path
@@ -24,6 +25,7 @@ from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
+from django.utils import timezone
 from mixer.backend.django import mixer as _mixer
 
 N_PER_FIXTURE = 3
@@ -41,6 +43,22 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def strict_duplicate_queries():
+    # Повторяющиеся запросы (N+1) в тестах — ошибка, а не запись в журнал.
+    with override_settings(NPLUSONE_STRICT=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -133,6 +151,21 @@ def another_user_client(another_user):
     return client
 
 
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    """Фабрика опубликованных постов с заданным заголовком."""
+    def make(title, text="Текст", **kwargs):
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user, location=None,
+            **{
+                "category": published_category,
+                "pub_date": timezone.now() - timedelta(days=1),
+                **kwargs,
+            },
+        )
+    return make
+
+
 def get_post_list_context_key(
         user_client, page_url, page_load_err_msg, key_missing_msg
 ):
@@ -0,0 +1,228 @@
+import re
+
+import pytest
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.admin.models import DELETION, LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from core.caching import get_version
+from core.paginators import POST_COUNT_NAMESPACE
+from core.services import bulk_delete_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_rows(mixer, published_category):
+    def make(n):
+        posts = mixer.cycle(n).blend(
+            "blog.Post", category=published_category, text="Текст " * 100
+        )
+        mixer.cycle(n).blend(
+            "blog.Comment", post=mixer.SELECT, text="Комментарий " * 100
+        )
+        return posts
+    return make
+
+
+def _get(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return response, [q["sql"] for q in queries.captured_queries]
+
+
+@pytest.mark.parametrize("url, params", [
+    ("/admin/blog/post/", {}),
+    ("/admin/blog/post/", {"is_published__exact": "1"}),
+    ("/admin/blog/comment/", {}),
+])
+def test_changelist_queries_do_not_grow(
+        admin_client, make_rows, url, params
+):
+    make_rows(3)
+    _, few = _get(admin_client, url, params)
+    make_rows(30)
+    response, many = _get(admin_client, url, params)
+    assert len(many) == len(few), (
+        "Убедитесь, что число запросов списка в админке не зависит от"
+        " числа строк."
+    )
+    counts = [sql for sql in many if sql.startswith("SELECT COUNT(")]
+    assert len(counts) <= 1, "Убедитесь, что полный подсчёт отключён."
+    rows = [sql for sql in many if "LIMIT" in sql]
+    assert rows and not re.search(r'"text"\s*(,|FROM)', rows[-1]), (
+        "Убедитесь, что полные тексты не загружаются в список."
+    )
+    assert "…" in response.content.decode("utf-8")
+
+
+@pytest.mark.parametrize("model", ["Post", "Comment"])
+def test_changelist_objects_keep_full_text(rf, admin_user, make_rows, model):
+    make_rows(1)
+    model = apps.get_model("blog", model)
+    request = rf.get("/")
+    request.user = admin_user
+    changelist = admin.site._registry[model].get_changelist_instance(request)
+    obj = changelist.get_queryset(request).get()
+    full_text = model.objects.values_list("text", flat=True).get()
+    obj.save()
+    assert obj.text == full_text, (
+        "Убедитесь, что список в админке не подменяет текст объектов"
+        " его началом."
+    )
+    assert model.objects.values_list("text", flat=True).get() == full_text
+    assert str(obj) == str(model.objects.get())
+
+
+@pytest.mark.parametrize("url", [
+    "/admin/blog/post/add/", "/admin/blog/comment/add/"
+])
+def test_change_form_uses_autocomplete(admin_client, make_rows, user, url):
+    make_rows(5)
+    response, _ = _get(admin_client, url)
+    content = response.content.decode("utf-8")
+    assert "admin-autocomplete" in content
+    assert f'<option value="{user.pk}">' not in content, (
+        "Убедитесь, что связанные объекты выбираются через автодополнение,"
+        " а не списком всех строк."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN для SQLite"
+)
+@pytest.mark.parametrize("url, params", [
+    ("/admin/blog/post/", {}),
+    ("/admin/blog/comment/", {}),
+    ("/admin/blog/comment/", {"created_at__gte": "2020-01-01 00:00:00+00:00"}),
+])
+def test_changelist_uses_index(admin_client, make_rows, url, params):
+    make_rows(30)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    _, queries = _get(admin_client, url, params)
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + queries[-1])
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert not any("TEMP B-TREE" in step for step in plan), (
+        f"Убедитесь, что список в админке не сортируется заново: {plan}"
+    )
+
+
+def _action(client, url, action, objects, **data):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(url, {
+            "action": action,
+            "_selected_action": [obj.pk for obj in objects],
+            **data,
+        })
+    assert response.status_code == 302
+    return [q["sql"] for q in queries.captured_queries]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr("core.services.BULK_CHUNK_SIZE", 4)
+
+
+@pytest.mark.parametrize("action, value", [
+    ("unpublish", False), ("publish", True)
+])
+def test_post_publish_actions_are_set_based(
+        admin_client, make_rows, small_chunks, action, value
+):
+    posts = make_rows(10)
+    queries = _action(admin_client, "/admin/blog/post/", action, posts)
+    updates = [sql for sql in queries if sql.startswith("UPDATE")]
+    assert len(updates) == 3, (
+        "Убедитесь, что действие выполняется одним UPDATE на пачку строк."
+    )
+    assert set(
+        Post.objects.values_list("is_published", flat=True)
+    ) == {value}
+
+
+def test_post_move_to_category(admin_client, make_rows, mixer):
+    posts = make_rows(5)
+    target = mixer.blend("blog.Category")
+    _action(
+        admin_client, "/admin/blog/post/", "move_to_category", posts,
+        category=target.pk,
+    )
+    assert set(Post.objects.values_list("category", flat=True)) == {
+        target.pk
+    }
+
+
+@pytest.mark.parametrize("url, model, remaining", [
+    ("/admin/blog/post/", "Post", {"Comment": 0}),
+    ("/admin/blog/comment/", "Comment", {"Post": 8}),
+    ("/admin/blog/category/", "Category", {"Post": 8}),
+])
+def test_bulk_delete_does_not_load_objects(
+        admin_client, make_rows, small_chunks, url, model, remaining
+):
+    make_rows(8)
+    objects = list(apps.get_model("blog", model).objects.all())
+    queries = _action(
+        admin_client, url, "delete_selected", objects, post="yes"
+    )
+    columns = f'"blog_{model.lower()}"."created_at"'
+    assert not [
+        sql for sql in queries
+        if sql.startswith("SELECT") and columns in sql.split(" FROM ")[0]
+    ], "Убедитесь, что удаление не загружает объекты в память."
+    assert not apps.get_model("blog", model).objects.exists()
+    for other, count in remaining.items():
+        assert apps.get_model("blog", other).objects.count() == count
+    assert not Post.objects.exclude(comment_count=0).exists()
+    logged = LogEntry.objects.filter(action_flag=DELETION)
+    assert sorted(int(pk) for pk in logged.values_list(
+        "object_id", flat=True
+    )) == sorted(obj.pk for obj in objects), (
+        "Убедитесь, что удаление каждого объекта записано в журнал админки."
+    )
+    assert set(logged.values_list("object_repr", flat=True)) == {
+        str(obj) for obj in objects
+    }
+
+
+def test_bulk_delete_asks_for_confirmation(admin_client, make_rows):
+    posts = make_rows(3)
+    response = admin_client.post("/admin/blog/post/", {
+        "action": "delete_selected",
+        "_selected_action": [post.pk for post in posts],
+    })
+    assert response.status_code == 200
+    assert "admin/delete_selected_confirmation.html" in [
+        template.name for template in response.templates
+    ]
+    content = response.content.decode("utf-8")
+    assert 'name="post" value="yes"' in content
+    assert str(posts[0]) in content
+    assert Post.objects.count() == 3, (
+        "Убедитесь, что без подтверждения посты не удаляются."
+    )
+    assert not LogEntry.objects.exists()
+
+
+def test_bulk_action_invalidates_caches_once(admin_client, make_rows):
+    posts = make_rows(5)
+    before = get_version(POST_COUNT_NAMESPACE)
+    _action(admin_client, "/admin/blog/post/", "unpublish", posts)
+    assert get_version(POST_COUNT_NAMESPACE) == before + 1, (
+        "Убедитесь, что массовое действие сбрасывает кеш один раз."
+    )
+
+
+def test_bulk_delete_invalidates_caches_without_admin(make_rows):
+    make_rows(5)
+    before = get_version(POST_COUNT_NAMESPACE)
+    assert bulk_delete_posts(Post.objects.all(), chunk_size=2) == 5
+    assert get_version(POST_COUNT_NAMESPACE) == before + 1, (
+        "Убедитесь, что массовое удаление само сбрасывает кеш."
+    )
@@ -0,0 +1,121 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import autocomplete
+from core.autocomplete import (
+    PrefixIndex, TitleIndex, discard_title_index, get_title_index,
+    reset_title_index,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    discard_title_index()
+    yield
+    if autocomplete._rebuilder is not None:
+        autocomplete._rebuilder.join()
+    discard_title_index()
+
+
+def _titles(client, query):
+    response = client.get("/search/autocomplete/", {"q": query})
+    assert response.status_code == 200
+    return sorted(item["title"] for item in response.json()["results"])
+
+
+def test_autocomplete_matches_word_prefix(
+        unlogged_client, make_post, published_category
+):
+    make_post("Прогулка в лесу")
+    make_post("Лесная дорога")
+    make_post("Город")
+    assert _titles(unlogged_client, "лес") == [
+        "Лесная дорога", "Прогулка в лесу"
+    ], "Убедитесь, что подсказки ищутся по началу любого слова заголовка."
+    published_category.title = "Лесные прогулки"
+    published_category.save()
+    assert "Лесные прогулки" in _titles(unlogged_client, "ЛЕСН")
+
+
+def test_autocomplete_hides_unpublished(unlogged_client, make_post, mixer):
+    make_post("Лес опубликован")
+    make_post("Лес черновик", is_published=False)
+    make_post("Лес в будущем", pub_date=timezone.now() + timedelta(days=1))
+    make_post(
+        "Лес скрытой категории",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    assert _titles(unlogged_client, "лес") == ["Лес опубликован"]
+
+
+def test_autocomplete_follows_saves_without_queries(
+        unlogged_client, make_post, published_category
+):
+    post = make_post("Старое название")
+    _titles(unlogged_client, "стар")
+    post.title = "Новое название"
+    post.save()
+    with CaptureQueriesContext(connection) as queries:
+        assert _titles(unlogged_client, "нов") == ["Новое название"]
+        assert _titles(unlogged_client, "стар") == []
+    assert not queries.captured_queries, (
+        "Убедитесь, что подсказки отдаются из индекса в памяти и"
+        " обновляются по сигналам сохранения."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert _titles(unlogged_client, "нов") == []
+    post.delete()
+    published_category.is_published = True
+    published_category.save()
+    assert _titles(unlogged_client, "нов") == []
+
+
+def test_prefix_index_respects_budget():
+    index = PrefixIndex(max_entries=5)
+    index.load([("post", 1, "Один два три", None)])
+    assert index.add("post", 2, "Четыре пять", None)
+    assert not index.add("post", 3, "Шесть", None)
+    assert len(index.entries) == 5
+    index.remove("post", 1)
+    assert index.add("post", 3, "Шесть", None)
+    assert [pk for _, pk, _, _ in index.search("ш", 10)] == [3]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_runs_in_background(make_post, monkeypatch):
+    post = make_post("Старое название")
+    old = get_title_index()
+    snapshot_taken, release = threading.Event(), threading.Event()
+    build = TitleIndex.build
+
+    def slow_build(index):
+        build(index)
+        snapshot_taken.set()
+        release.wait(5)
+        return index
+
+    monkeypatch.setattr(TitleIndex, "build", slow_build)
+    reset_title_index()
+    assert get_title_index() is old, (
+        "Убедитесь, что пока индекс перестраивается, подсказки отдаются"
+        " из прежнего."
+    )
+    assert snapshot_taken.wait(5)
+    post.title = "Новое название"
+    post.save()
+    release.set()
+    autocomplete._rebuilder.join()
+    index = get_title_index()
+    assert index is not old
+    assert [pk for _, pk, _, _ in index.search("нов", 10)] == [post.pk], (
+        "Убедитесь, что изменения во время перестройки не теряются."
+    )
+    assert index.search("стар", 10) == []
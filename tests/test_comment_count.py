@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _comment_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert _comment_count(post) == 0
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": text})
+    assert _comment_count(post) == 2, (
+        "Убедитесь, что создание комментария увеличивает comment_count."
+    )
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(
+        f"/posts/{post.id}/comment/delete_comment/{comment.id}/"
+    )
+    assert _comment_count(post) == 1, (
+        "Убедитесь, что удаление комментария уменьшает comment_count."
+    )
+
+
+def test_comment_count_follows_admin_deletes(
+        mixer, admin_client, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=3)
+    admin_client.post(
+        f"/admin/blog/comment/{comments[0].id}/delete/", {"post": "yes"}
+    )
+    assert _comment_count(post) == 2
+    admin_client.post("/admin/blog/comment/", {
+        "action": "delete_selected",
+        "_selected_action": [c.id for c in comments[1:]],
+        "post": "yes",
+    })
+    assert _comment_count(post) == 0
+
+
+def test_reconcile_comment_counts(
+        mixer, post_with_published_location, make_post
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    in_sync = make_post("Без расхождений")
+    mixer.blend("blog.Comment", post=in_sync)
+    Post.objects.filter(pk=in_sync.pk).update(comment_count=1)
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    out = StringIO()
+    call_command("reconcile_comment_counts", "--dry-run", stdout=out)
+    assert out.getvalue() == "Найдено расхождений: 1\n", (
+        "Убедитесь, что --dry-run сообщает число расхождений."
+    )
+    assert _comment_count(post) == 7, (
+        "Убедитесь, что --dry-run не меняет comment_count."
+    )
+    out = StringIO()
+    call_command("reconcile_comment_counts", stdout=out)
+    assert out.getvalue() == "Исправлено расхождений: 1\n"
+    assert (_comment_count(post), _comment_count(in_sync)) == (2, 1), (
+        "Убедитесь, что команда исправляет comment_count по комментариям."
+    )
+    out = StringIO()
+    call_command("reconcile_comment_counts", "--dry-run", stdout=out)
+    assert out.getvalue() == "Найдено расхождений: 0\n"
@@ -0,0 +1,67 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.const import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_PER_PAGE * 2 + 5).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+def _comment_ids(content):
+    return [int(i) for i in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def _load_more_url(content):
+    match = re.search(r'data-load-comments\s+href="([^"]+)"', content)
+    return match and match.group(1).replace("&amp;", "&")
+
+
+def test_detail_shows_first_comment_batch(
+        user_client, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    with CaptureQueriesContext(connection) as queries:
+        content = user_client.get(url).content.decode("utf-8")
+    assert _comment_ids(content) == [c.id for c in many_comments][
+        :COMMENTS_PER_PAGE
+    ], (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев."
+    )
+    assert _load_more_url(content)
+    assert len(queries) == 4
+
+
+def test_load_more_returns_next_batches(
+        user_client, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    content = user_client.get(url).content.decode("utf-8")
+    seen = _comment_ids(content)
+    while _load_more_url(content):
+        response = user_client.get(_load_more_url(content))
+        assert response.status_code == 200
+        content = response.content.decode("utf-8")
+        assert "<html" not in content
+        seen += _comment_ids(content)
+    assert seen == [c.id for c in many_comments], (
+        "Убедитесь, что «Показать ещё» догружает комментарии по порядку и"
+        " без повторов."
+    )
+
+
+def test_comments_fragment_respects_visibility(
+        another_user_client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == 404
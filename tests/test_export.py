@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def rows(mixer, published_category):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", category=published_category, text='Текст, "в кавычках"'
+    )
+    mixer.cycle(7).blend("blog.Comment", post=mixer.SELECT)
+    return posts
+
+
+def _export(client, model, action):
+    response = client.post(f"/admin/blog/{model}/", {
+        "action": action,
+        "_selected_action": list(
+            {"post": Post, "comment": Comment}[model]
+            .objects.values_list("pk", flat=True)
+        ),
+    })
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся потоком, а не собирается в памяти."
+    )
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+def test_admin_csv_export(admin_client, rows):
+    content = _export(admin_client, "post", "export_csv")
+    exported = list(csv.DictReader(io.StringIO(content)))
+    assert [int(row["id"]) for row in exported] == sorted(
+        post.pk for post in rows
+    )
+    assert exported[0]["text"] == 'Текст, "в кавычках"'
+    assert "author_id" in exported[0]
+
+
+def test_admin_jsonl_export(admin_client, rows):
+    content = _export(admin_client, "comment", "export_jsonl")
+    exported = [json.loads(line) for line in content.splitlines()]
+    assert len(exported) == 7
+    assert {"id", "text", "post_id", "author_id"} <= exported[0].keys()
+
+
+@pytest.mark.parametrize("export_format", ["csv", "jsonl"])
+def test_export_blog_command(rows, tmp_path, export_format):
+    output = tmp_path / f"posts.{export_format}"
+    call_command(
+        "export_blog", "post", "--format", export_format,
+        "--output", str(output), "--chunk-size", "2",
+        stdout=io.StringIO(),
+    )
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == len(rows) + (export_format == "csv")
+    out = io.StringIO()
+    call_command("export_blog", "post", "--format", export_format, stdout=out)
+    assert out.getvalue().splitlines() == lines
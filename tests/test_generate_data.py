@@ -0,0 +1,81 @@
+import io
+from collections import Counter
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+from core.services import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+ARGS = ["--users", "50", "--posts", "500", "--comments", "2000",
+        "--categories", "20", "--batch-size", "97"]
+
+
+def _generate(*args):
+    out = io.StringIO()
+    call_command("generate_blog_data", *ARGS, *args, stdout=out)
+    return out.getvalue()
+
+
+def _snapshot():
+    return (
+        # Даты отсчитываются от момента запуска, поэтому не сравниваются.
+        list(Post.objects.order_by("pk").values_list(
+            "title", "text", "author_id", "category_id", "comment_count"
+        )),
+        list(Comment.objects.order_by("pk").values_list("post_id", "text")),
+    )
+
+
+def _clear():
+    Comment.objects.all()._raw_delete("default")
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    get_user_model().objects.all().delete()
+
+
+def test_generate_counts_and_comment_count():
+    _generate("--seed", "1")
+    assert get_user_model().objects.count() == 50
+    assert Post.objects.count() == 500
+    assert Comment.objects.count() == 2000
+    assert not Post.objects.alias(actual=Count("comments")).exclude(
+        comment_count=F("actual")
+    ).exists(), (
+        "Убедитесь, что comment_count совпадает с числом комментариев."
+    )
+    post = Post.objects.first()
+    assert list(search_posts(Post.objects.all(), post.title.split()[0])), (
+        "Убедитесь, что сгенерированные посты попадают в поисковый индекс."
+    )
+
+
+def test_generate_is_deterministic():
+    _generate("--seed", "7")
+    first = _snapshot()
+    _clear()
+    _generate("--seed", "7")
+    assert _snapshot() == first, (
+        "Убедитесь, что при одном и том же --seed данные совпадают."
+    )
+    _clear()
+    _generate("--seed", "8")
+    assert _snapshot() != first
+
+
+def test_generate_has_realistic_skew():
+    _generate("--seed", "3")
+    authors = Counter(Post.objects.values_list("author_id", flat=True))
+    assert authors.most_common(1)[0][1] > 5 * 500 / 50, (
+        "Убедитесь, что у немногих авторов большая часть постов."
+    )
+    top = Post.objects.order_by("-comment_count")[:25]
+    assert sum(post.comment_count for post in top) > 2000 * 0.2
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists()
+    assert Post.objects.filter(is_published=False).exists()
+    assert Category.objects.filter(is_published=False).exists()
@@ -0,0 +1,128 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from blog.models import Category, Comment, Location, Post
+from core.loader import iter_json_array
+from core.services import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+
+
+def _import(*args):
+    out = io.StringIO()
+    call_command("import_blog", *map(str, args), stdout=out)
+    return out.getvalue()
+
+
+def test_iter_json_array_reads_in_pieces():
+    records = [{"model": "blog.location", "pk": i, "fields": {
+        "name": f"Место {i} [, ] {{}}"
+    }} for i in range(20)]
+    text = json.dumps(records, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(io.StringIO(text), read_size=7)) == records
+
+
+def test_import_db_json():
+    records = json.loads(DB_JSON.read_text(encoding="utf-8"))
+    expected = {
+        model: sum(r["model"] == label for r in records)
+        for label, model in [
+            ("auth.user", get_user_model()),
+            ("blog.category", Category),
+            ("blog.location", Location),
+            ("blog.post", Post),
+        ]
+    }
+    out = _import(DB_JSON, "--batch-size", "10")
+    for model, count in expected.items():
+        assert model.objects.count() == count
+    assert "строк/с" in out, "Убедитесь, что команда сообщает скорость."
+    first = next(r for r in records if r["model"] == "blog.post")
+    post = Post.objects.get(pk=first["pk"])
+    assert post.created_at.isoformat().startswith(
+        first["fields"]["created_at"][:19]
+    ), "Убедитесь, что даты из файла не затираются при вставке."
+    assert list(search_posts(Post.objects.all(), post.title.split()[0]))
+
+
+def test_import_jsonl_recounts_comments(tmp_path, mixer, user):
+    category = mixer.blend("blog.Category")
+    lines = [{"model": "blog.post", "pk": 100, "fields": {
+        "title": "Пост", "text": "Текст", "author": user.pk,
+        "category": category.pk, "pub_date": "2024-01-01T00:00:00Z",
+        "is_published": True, "created_at": "2024-01-01T00:00:00Z",
+    }}] + [{"model": "blog.comment", "pk": i, "fields": {
+        "text": f"Комментарий {i}", "post": 100, "author": user.pk,
+        "created_at": "2024-01-02T00:00:00Z",
+    }} for i in range(1, 8)]
+    path = tmp_path / "blog.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(line) for line in lines), encoding="utf-8"
+    )
+    _import(path, "--batch-size", "3")
+    assert Comment.objects.count() == 7
+    assert Post.objects.get(pk=100).comment_count == 7
+
+
+def test_import_reports_bad_file(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('[{"model": "blog.location", "pk": 1, ', encoding="utf-8")
+    with pytest.raises(CommandError):
+        _import(path)
+
+
+def _write_jsonl(path, lines):
+    path.write_text(
+        "\n".join(json.dumps(line) for line in lines), encoding="utf-8"
+    )
+    return path
+
+
+def test_import_m2m_and_forward_references(tmp_path, mixer, user):
+    category = mixer.blend("blog.Category")
+    lines = [
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Раньше поста", "post": 200, "author": 300,
+            "created_at": "2024-01-02T00:00:00Z",
+        }},
+        {"model": "auth.user", "pk": 300, "fields": {
+            "username": "reader", "password": "!", "groups": [400],
+        }},
+        {"model": "auth.group", "pk": 400, "fields": {"name": "Читатели"}},
+        {"model": "blog.post", "pk": 200, "fields": {
+            "title": "Пост", "text": "Текст", "author": user.pk,
+            "category": category.pk, "pub_date": "2024-01-01T00:00:00Z",
+            "is_published": True,
+        }},
+    ]
+    _import(_write_jsonl(tmp_path / "blog.jsonl", lines), "--batch-size", "1")
+    reader = get_user_model().objects.get(pk=300)
+    assert list(reader.groups.values_list("name", flat=True)) == [
+        "Читатели"
+    ], "Убедитесь, что связи многие-ко-многим загружаются."
+    assert Post.objects.get(pk=200).comment_count == 1, (
+        "Убедитесь, что ссылки на объекты из следующих пачек допустимы."
+    )
+    assert Post._meta.get_field("updated_at").auto_now
+    assert Post._meta.get_field("created_at").auto_now_add
+
+
+def test_import_is_all_or_nothing(tmp_path, user):
+    lines = [{"model": "blog.location", "pk": i, "fields": {
+        "name": f"Место {i}",
+    }} for i in range(1, 6)] + [{"model": "blog.comment", "pk": 1, "fields": {
+        "text": "Без поста", "post": 999, "author": user.pk,
+    }}]
+    path = _write_jsonl(tmp_path / "broken.jsonl", lines)
+    with pytest.raises(CommandError):
+        _import(path, "--batch-size", "2")
+    assert not Location.objects.exists(), (
+        "Убедитесь, что ошибка не оставляет загрузку выполненной наполовину."
+    )
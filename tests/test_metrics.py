@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+
+import pytest
+
+from core import metrics
+from blog.models import Category, Comment, Post
+from core.metrics import Counter, Histogram, Registry
+from core.services import (
+    bulk_delete_categories, bulk_delete_comments, bulk_delete_posts,
+    bulk_update_posts,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+LATENCY = "blogicum_http_request_duration_seconds"
+SCRAPER_IP = "10.0.0.1"
+
+
+@pytest.fixture(autouse=True)
+def allow_scraper(settings):
+    settings.METRICS_ALLOWED_IPS = [SCRAPER_IP]
+
+
+def _scrape(client):
+    response = client.get("/metrics", REMOTE_ADDR=SCRAPER_IP)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    return response.content.decode()
+
+
+def _value(text, sample):
+    for line in text.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name == sample:
+            return float(value)
+    return 0.0
+
+
+def test_render_format():
+    registry = Registry()
+    hits = registry.register(Counter("hits_total", "Попадания.", ("path",)))
+    latency = registry.register(
+        Histogram("latency_seconds", "Время.", ("view",), (0.1, 1))
+    )
+    hits.inc(path='a"b\\')
+    hits.inc(2, path='a"b\\')
+    for amount in (0.05, 0.5, 5):
+        latency.observe(amount, view="index")
+    assert registry.render() == (
+        "# HELP hits_total Попадания.\n"
+        "# TYPE hits_total counter\n"
+        'hits_total{path="a\\"b\\\\"} 3\n'
+        "# HELP latency_seconds Время.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{view="index",le="0.1"} 1\n'
+        'latency_seconds_bucket{view="index",le="1"} 2\n'
+        'latency_seconds_bucket{view="index",le="+Inf"} 3\n'
+        'latency_seconds_sum{view="index"} 5.55\n'
+        'latency_seconds_count{view="index"} 3\n'
+    )
+
+
+def test_counter_is_thread_safe():
+    counter = Counter("n_total", "", ("kind",))
+
+    def work():
+        for _ in range(10_000):
+            counter.inc(kind="x")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.values[("x",)] == 80_000, (
+        "Убедитесь, что счётчики не теряют значения при работе потоков."
+    )
+
+
+def test_requests_and_queries_are_counted(
+        client, post_with_published_location
+):
+    sample = f'{LATENCY}_count{{view="blog:index",status="200"}}'
+    before = _value(_scrape(client), sample)
+    client.get("/")
+    client.get("/")
+    text = _scrape(client)
+    assert _value(text, sample) == before + 2, (
+        "Убедитесь, что /metrics считает запросы по имени URL и статусу."
+    )
+    assert _value(
+        text, 'blogicum_db_queries_per_request_sum{view="blog:index"}'
+    ) > 0
+    not_found = f'{LATENCY}_count{{view="",status="404"}}'
+    client.get("/no-such-page/")
+    assert _value(_scrape(client), not_found) == _value(text, not_found) + 1
+
+
+def test_cache_lookups_are_counted(
+        settings, client, post_with_published_location
+):
+    settings.PAGE_CACHE_ENABLED = True
+    hit = 'blogicum_cache_lookups_total{cache="page",result="hit"}'
+    miss = 'blogicum_cache_lookups_total{cache="page",result="miss"}'
+    text = _scrape(client)
+    hits, misses = _value(text, hit), _value(text, miss)
+    client.get("/")
+    client.get("/")
+    text = _scrape(client)
+    assert (_value(text, hit), _value(text, miss)) == (hits + 1, misses + 1)
+
+
+def test_writes_are_counted(client, mixer, post_with_published_location):
+    samples = [
+        f'blogicum_writes_total{{model="comment",action="{action}"}}'
+        for action in ("create", "update", "delete")
+    ]
+    text = _scrape(client)
+    before = [_value(text, sample) for sample in samples]
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    comment.save()
+    comment.delete()
+    text = _scrape(client)
+    assert [_value(text, sample) for sample in samples] == [
+        value + 1 for value in before
+    ]
+
+
+def test_bulk_writes_are_counted(client, mixer, make_post):
+    samples = {
+        (model, action): (
+            f'blogicum_writes_total{{model="{model}",action="{action}"}}'
+        )
+        for model in ("post", "comment")
+        for action in ("update", "delete")
+    }
+    text = _scrape(client)
+    before = {key: _value(text, sample) for key, sample in samples.items()}
+    posts = [make_post(f"Пост {index}") for index in range(4)]
+    for post in posts:
+        mixer.cycle(2).blend("blog.Comment", post=post)
+    bulk_update_posts(Post.objects.filter(pk=posts[0].pk), is_published=False)
+    bulk_delete_comments(Comment.objects.filter(post=posts[1]))
+    bulk_delete_posts(Post.objects.filter(pk=posts[2].pk))
+    bulk_delete_categories(Category.objects.filter(pk=posts[3].category_id))
+    text = _scrape(client)
+    assert {
+        key: _value(text, sample) - before[key]
+        for key, sample in samples.items()
+    } == {
+        # у трёх оставшихся постов сбрасывается удалённая категория
+        ("post", "update"): 1 + 3,
+        ("post", "delete"): 1,
+        ("comment", "update"): 0,
+        ("comment", "delete"): 2 + 2,
+    }, "Убедитесь, что массовые изменения и удаления попадают в метрики."
+
+
+def test_metrics_access(settings, client, admin_client):
+    del settings.METRICS_ALLOWED_IPS
+    # За обратным прокси на том же хосте все запросы приходят с 127.0.0.1.
+    assert client.get("/metrics", REMOTE_ADDR="127.0.0.1").status_code == (
+        403
+    ), "Убедитесь, что по умолчанию /metrics закрыт для всех адресов."
+    assert admin_client.get("/metrics").status_code == 200
+    settings.METRICS_ALLOWED_IPS = [SCRAPER_IP]
+    assert client.get("/metrics").status_code == 403
+    assert client.get(
+        "/metrics", REMOTE_ADDR=SCRAPER_IP
+    ).status_code == 200
+
+
+def test_multiprocess_mode_sums_process_files(settings, tmp_path, client):
+    settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+    sample = 'blogicum_writes_total{model="post",action="create"}'
+    before = _value(_scrape(client), sample)
+    (tmp_path / "dead-worker.json").write_text(json.dumps({
+        "blogicum_writes_total": [[["post", "create"], 5]],
+        "unknown_metric": [[[], 1]],
+    }))
+    pid = os.fork()
+    if not pid:
+        # Дочерний процесс начинает с нуля и пишет только свой файл.
+        for _ in range(3):
+            metrics.record_write("post", "create")
+        metrics.REGISTRY.flush(tmp_path)
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert len(list(tmp_path.glob("*.json"))) == 3
+    assert _value(_scrape(client), sample) == before + 5 + 3, (
+        "Убедитесь, что в режиме нескольких процессов /metrics складывает"
+        " значения всех процессов."
+    )
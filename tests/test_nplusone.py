@@ -0,0 +1,73 @@
+import json
+import logging
+
+import pytest
+from django.test import override_settings
+
+from blog.views import IndexListView
+from core import nplusone
+from core.nplusone import DuplicateQueriesError, normalize_sql
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def without_select_related(monkeypatch):
+    monkeypatch.setattr(
+        IndexListView, "get_queryset",
+        lambda self: self.get_count_queryset().order_by("-pub_date"),
+    )
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        'SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "n" = 10'
+        " AND \"s\" = 'it''s' LIMIT 21"
+    ) == normalize_sql(
+        'SELECT * FROM "t" WHERE "id" IN (%s) AND "n" = 3'
+        " AND \"s\" = 'x' LIMIT 5"
+    ) == 'SELECT * FROM "t" WHERE "id" IN (...) AND "n" = ? AND "s" = ? LIMIT ?'
+    assert normalize_sql('SELECT "blog_post2"."id"') == (
+        'SELECT "blog_post2"."id"'
+    )
+
+
+def test_strict_mode_raises_on_n_plus_one(
+        user_client, many_posts_with_published_locations,
+        without_select_related,
+):
+    with pytest.raises(DuplicateQueriesError) as error:
+        user_client.get("/")
+    record = json.loads(str(error.value))
+    assert record["view"] == "blog:index"
+    templates = {pattern["template"] for pattern in record["patterns"]}
+    assert "includes/post_card.html" in templates, (
+        "Убедитесь, что отчёт о повторяющихся запросах указывает шаблон,"
+        " из которого они пришли."
+    )
+    assert all(pattern["count"] >= 5 for pattern in record["patterns"])
+    for table in ("auth_user", "blog_category", "blog_location"):
+        assert any(table in p["sql"] for p in record["patterns"])
+
+
+@override_settings(NPLUSONE_STRICT=False, NPLUSONE_SAMPLE_RATE=1)
+def test_sampled_mode_logs(
+        user_client, many_posts_with_published_locations,
+        without_select_related, caplog, monkeypatch,
+):
+    monkeypatch.setattr(nplusone.logger, "propagate", True)
+    caplog.set_level(logging.WARNING, logger="core.nplusone")
+    assert user_client.get("/").status_code == 200
+    records = [r for r in caplog.records if r.name == "core.nplusone"]
+    assert len(records) == 1
+    assert json.loads(records[0].getMessage())["view"] == "blog:index"
+
+
+@override_settings(NPLUSONE_STRICT=False, NPLUSONE_SAMPLE_RATE=0)
+def test_unsampled_requests_are_not_checked(
+        user_client, many_posts_with_published_locations,
+        without_select_related, caplog, monkeypatch,
+):
+    monkeypatch.setattr(nplusone.logger, "propagate", True)
+    assert user_client.get("/").status_code == 200
+    assert not [r for r in caplog.records if r.name == "core.nplusone"]
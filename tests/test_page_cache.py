@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.caching import page_cache_timeout
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def enable_page_cache(settings):
+    settings.PAGE_CACHE_ENABLED = True
+    settings.PAGE_CACHE_TIMEOUT = 300
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, len(queries)
+
+
+@pytest.mark.parametrize("url", ["/", "/posts/{post_id}/"])
+def test_anonymous_page_is_cached(
+        unlogged_client, post_with_published_location, url
+):
+    url = url.format(post_id=post_with_published_location.id)
+    first, _ = _get(unlogged_client, url)
+    second, n_queries = _get(unlogged_client, url)
+    assert second.status_code == 200
+    assert n_queries == 0, (
+        "Убедитесь, что повторный запрос анонимного читателя отдаётся"
+        " из кеша."
+    )
+    assert second.content == first.content
+
+
+def test_logged_in_page_is_not_cached(
+        user_client, post_with_published_location
+):
+    _get(user_client, "/")
+    _, n_queries = _get(user_client, "/")
+    assert n_queries > 0
+
+
+@pytest.mark.parametrize("model", ["Post", "Comment", "Category", "Location"])
+def test_page_cache_invalidated_on_save(
+        mixer, unlogged_client, post_with_published_location, model
+):
+    _get(unlogged_client, "/")
+    related = {
+        "Post": post_with_published_location,
+        "Comment": mixer.blend(
+            "blog.Comment", post=post_with_published_location
+        ),
+        "Category": post_with_published_location.category,
+        "Location": post_with_published_location.location,
+    }[model]
+    related.save()
+    _, n_queries = _get(unlogged_client, "/")
+    assert n_queries > 0, (
+        f"Убедитесь, что сохранение {model} сбрасывает кеш страниц."
+    )
+    related.delete()
+    _, n_queries = _get(unlogged_client, "/")
+    assert n_queries > 0
+
+
+def test_scheduled_post_limits_timeout(
+        mixer, unlogged_client, user, published_category
+):
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert 0 < page_cache_timeout() <= 30, (
+        "Убедитесь, что страница кешируется не дольше, чем до ближайшей"
+        " отложенной публикации."
+    )
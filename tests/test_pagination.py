@@ -0,0 +1,277 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+from core.paginators import CountProvider
+from core.services import estimate_row_count
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts_with_same_pub_date(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=pub_date,
+    )
+
+
+def _collect_pages(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    pages = [response.context["page_obj"]]
+    while pages[-1].has_next():
+        page = pages[-1]
+        response = client.get(
+            url, {"page": page.next_page_number(), "cursor": page.next_cursor}
+        )
+        assert response.status_code == HTTPStatus.OK
+        pages.append(response.context["page_obj"])
+    return pages
+
+
+def test_cursor_pages_cover_all_posts(user_client, posts_with_same_pub_date):
+    pages = _collect_pages(user_client, "/")
+    ids = [post.id for page in pages for post in page]
+    assert len(ids) == len(posts_with_same_pub_date) == len(set(ids)), (
+        "Убедитесь, что переход по курсору не теряет и не повторяет"
+        " публикации с одинаковой датой публикации."
+    )
+    assert ids == sorted(ids, reverse=True)
+    assert [page.number for page in pages] == [1, 2, 3]
+
+
+def test_cursor_previous_page(user_client, posts_with_same_pub_date):
+    pages = _collect_pages(user_client, "/")
+    last = pages[-1]
+    response = user_client.get(
+        "/", {"page": last.previous_page_number(),
+              "cursor": last.previous_cursor}
+    )
+    previous = response.context["page_obj"]
+    assert [post.id for post in previous] == [post.id for post in pages[-2]]
+    assert previous.has_next() and previous.has_previous()
+
+
+@pytest.mark.parametrize("url", ["/", "/category/{slug}/", "/profile/{user}/"])
+def test_cursor_page_has_no_offset(
+        user_client, user, published_category, posts_with_same_pub_date, url
+):
+    url = url.format(slug=published_category.slug, user=user.username)
+    first_page = user_client.get(url).context["page_obj"]
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url, {"cursor": first_page.next_cursor})
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+    for query in queries.captured_queries:
+        assert "OFFSET" not in query["sql"].upper(), (
+            "Убедитесь, что страница по курсору выбирается без OFFSET."
+        )
+
+
+@pytest.mark.parametrize("url", ["/", "/profile/{user}/"])
+def test_stale_forward_cursor(user_client, user, posts_with_same_pub_date, url):
+    url = url.format(user=user.username)
+    pages = _collect_pages(user_client, url)
+    cursor = pages[-2].next_cursor
+    Post.objects.filter(pk__in=[post.pk for post in pages[-1]]).delete()
+    response = user_client.get(url, {"cursor": cursor})
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что устаревший курсор не приводит к ошибке сервера."
+    )
+    page = response.context["page_obj"]
+    assert not page.object_list
+    assert (page.next_cursor, page.previous_cursor) == (None, None)
+
+
+@pytest.mark.parametrize("url", ["/", "/profile/{user}/"])
+def test_backward_cursor_before_first_row(
+        user_client, user, posts_with_same_pub_date, url
+):
+    url = url.format(user=user.username)
+    first = user_client.get(url).context["page_obj"]
+    cursor = first.paginator.encode_cursor(first[0], backward=True)
+    response = user_client.get(url, {"cursor": cursor})
+    assert response.status_code == HTTPStatus.OK
+    page = response.context["page_obj"]
+    assert not page.object_list
+    assert (page.next_cursor, page.previous_cursor) == (None, None)
+
+
+@pytest.mark.parametrize("url", ["/", "/profile/{user}/"])
+def test_last_page_link_has_no_offset(
+        user_client, user, posts_with_same_pub_date, url
+):
+    url = url.format(user=user.username)
+    pages = _collect_pages(user_client, url)
+    content = user_client.get(url).content.decode()
+    last_link = re.search(
+        r'href="\?page=(\d+)&amp;cursor=last">\s*Последняя', content
+    )
+    assert last_link, (
+        "Убедитесь, что ссылка на последнюю страницу идёт по курсору."
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(
+            url, {"page": last_link.group(1), "cursor": "last"}
+        )
+    for query in queries.captured_queries:
+        assert "OFFSET" not in query["sql"].upper()
+    page = response.context["page_obj"]
+    ids = [post.id for page in pages for post in page]
+    assert [post.id for post in page] == ids[-N_PER_PAGE:]
+    assert page.number == len(pages)
+    assert not page.has_next() and page.has_previous()
+    previous = user_client.get(
+        url, {"cursor": page.previous_cursor}
+    ).context["page_obj"]
+    assert previous[-1].id == ids[-N_PER_PAGE - 1]
+
+
+def test_invalid_cursor(user_client, posts_with_same_pub_date):
+    response = user_client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def _count_queries(queries):
+    return [
+        q["sql"] for q in queries.captured_queries
+        if q["sql"].upper().startswith("SELECT COUNT(")
+    ]
+
+
+@pytest.mark.parametrize("url", ["/", "/category/{slug}/", "/profile/{user}/"])
+def test_post_count_is_cached(
+        user_client, user, published_category, posts_with_same_pub_date, url
+):
+    url = url.format(slug=published_category.slug, user=user.username)
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get(url)
+    count_sql = _count_queries(queries)
+    assert len(count_sql) == 1
+    assert "blog_comment" not in count_sql[0], (
+        "Убедитесь, что подсчёт публикаций не соединяется с комментариями."
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert not _count_queries(queries), (
+        "Убедитесь, что число публикаций берётся из кеша."
+    )
+    assert response.context["paginator"].count == len(
+        posts_with_same_pub_date
+    )
+
+
+def test_post_count_invalidated_on_save(
+        mixer, user_client, user, published_category, posts_with_same_pub_date
+):
+    user_client.get("/")
+    mixer.blend("blog.Post", author=user, category=published_category)
+    response = user_client.get("/")
+    assert response.context["paginator"].count == (
+        len(posts_with_same_pub_date) + 1
+    ), "Убедитесь, что кеш числа публикаций сбрасывается при сохранении."
+
+
+def test_scheduled_post_limits_count_timeout(
+        mixer, user, published_category, settings
+):
+    settings.POST_COUNT_CACHE_TIMEOUT = 300
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    provider = CountProvider(Post.objects.all(), ("index",))
+    assert 0 < provider.timeout <= 30, (
+        "Убедитесь, что число публикаций кешируется не дольше, чем до"
+        " ближайшей отложенной публикации."
+    )
+
+
+def test_post_count_estimate_for_large_table(
+        user_client, posts_with_same_pub_date, settings
+):
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    settings.POST_COUNT_ESTIMATE_THRESHOLD = 1
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/")
+    assert not _count_queries(queries)
+    assert response.context["paginator"].count == len(
+        posts_with_same_pub_date
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="sqlite_stat1 только в SQLite"
+)
+def test_estimate_ignores_partial_indexes(
+        mixer, user, published_category, posts_with_same_pub_date
+):
+    mixer.cycle(40).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        cursor.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = 'blog_post'"
+        )
+        sizes = {int(stat.split()[0]) for stat, in cursor.fetchall()}
+    assert len(sizes) > 1, "Нужен частичный индекс с меньшим числом строк."
+    assert estimate_row_count(Post) == Post.objects.count(), (
+        "Убедитесь, что оценка берётся по полному, а не частичному индексу."
+    )
+
+
+def test_overestimated_count_clamps_to_last_page(
+        mixer, user_client, user, published_category,
+        posts_with_same_pub_date, settings,
+):
+    mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    settings.POST_COUNT_ESTIMATE_THRESHOLD = 1
+    visible = len(posts_with_same_pub_date)
+    last = -(-visible // N_PER_PAGE)
+    response = user_client.get("/", {"page": last + 2})
+    assert response.status_code == HTTPStatus.OK
+    page = response.context["page_obj"]
+    assert page.number == last and len(page.object_list), (
+        "Убедитесь, что пустой хвост страниц от завышенной оценки"
+        " сводится к последней настоящей странице."
+    )
+    assert response.context["paginator"].count == visible
+    assert user_client.get("/").context["paginator"].count == visible
+
+
+def test_paginator_links_are_elided(
+        mixer, user_client, user, published_category
+):
+    mixer.cycle(N_PER_PAGE * 12).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    response = user_client.get("/", {"page": 6})
+    page_links = re.findall(
+        r'href="\?page=(\d+)(?:&amp;cursor=last)?"', response.content.decode()
+    )
+    assert "…" in response.content.decode()
+    assert sorted(set(map(int, page_links))) == [1, 4, 5, 7, 8, 12], (
+        "Убедитесь, что пагинатор выводит только первую, последнюю и"
+        " соседние с текущей страницы."
+    )
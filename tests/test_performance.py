@@ -0,0 +1,96 @@
+import json
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import middleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def perf_log(caplog, monkeypatch):
+    monkeypatch.setattr(middleware.logger, "propagate", True)
+    caplog.set_level(logging.INFO, logger="core.middleware")
+    return caplog
+
+
+def _timings(response):
+    return {
+        name: params
+        for name, params in re.findall(
+            r"(\w+)((?:;[^,]*)?)", response["Server-Timing"]
+        )
+    }
+
+
+@override_settings(PERFORMANCE_SAMPLE_RATE=1)
+def test_sampled_request_reports_timings(
+        user_client, post_with_published_location, perf_log
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    timings = _timings(response)
+    assert set(timings) == {"db", "tpl", "view", "total", "size"}, (
+        "Убедитесь, что заголовок Server-Timing содержит время SQL,"
+        " шаблонов, представления, общее время и размер ответа."
+    )
+    assert f'desc="{len(queries)} queries"' in timings["db"]
+    assert f'desc="{len(response.content)}"' in timings["size"]
+    records = [
+        json.loads(r.getMessage()) for r in perf_log.records
+        if r.name == "core.middleware"
+    ]
+    assert len(records) == 1
+    record = records[0]
+    assert record["view"] == "blog:post_detail"
+    assert record["queries"] == len(queries)
+    assert record["bytes"] == len(response.content)
+    assert record["template_ms"] > 0
+    assert record["total_ms"] >= record["view_ms"]
+
+
+@override_settings(PERFORMANCE_SAMPLE_RATE=0)
+def test_unsampled_request_is_untouched(
+        user_client, post_with_published_location, perf_log
+):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+    assert not [r for r in perf_log.records if r.name == "core.middleware"]
+    assert not any(
+        isinstance(wrapper, middleware.RequestTimings)
+        for wrapper in connection.execute_wrappers
+    )
+
+
+@override_settings(PERFORMANCE_SAMPLE_RATE=1)
+def test_streaming_response_has_no_size(
+        admin_client, post_with_published_location, perf_log
+):
+    response = admin_client.post("/admin/blog/post/", {
+        "action": "export_csv",
+        "_selected_action": [post_with_published_location.pk],
+    })
+    assert response.streaming
+    assert "size" not in _timings(response)
+
+
+def test_template_timing_does_not_patch_django():
+    from django.template import engines
+    from django.template.backends.django import Template
+
+    from core.template_backends import TimedTemplate
+
+    assert Template.render.__module__ == "django.template.backends.django", (
+        "Убедитесь, что время шаблонов замеряется бэкендом, а не заменой"
+        " Template.render во всём процессе."
+    )
+    assert isinstance(
+        engines["django"].get_template("base.html"), TimedTemplate
+    )
@@ -0,0 +1,49 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _content(client, url="/"):
+    return client.get(url).content.decode("utf-8")
+
+
+def test_post_card_is_cached_per_post(
+        user_client, many_posts_with_published_locations
+):
+    first, second = Post.objects.order_by("-pub_date", "-pk")[:2]
+    _content(user_client)
+    # update() не меняет updated_at — карточка должна остаться в кеше.
+    Post.objects.filter(pk=first.pk).update(title="Заголовок без версии")
+    assert "Заголовок без версии" not in _content(user_client), (
+        "Убедитесь, что карточки постов берутся из кеша фрагментов."
+    )
+    second.title = "Новый заголовок"
+    second.save()
+    content = _content(user_client)
+    assert "Новый заголовок" in content, (
+        "Убедитесь, что изменение поста сбрасывает кеш его карточки."
+    )
+    assert "Заголовок без версии" not in content, (
+        "Убедитесь, что изменение поста не сбрасывает чужие карточки."
+    )
+
+
+def test_post_card_follows_comment_count(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert "Комментарии (0)" in _content(user_client)
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Комментарий"})
+    assert "Комментарии (1)" in _content(user_client)
+
+
+def test_post_card_follows_category(
+        user_client, post_with_published_location
+):
+    category = post_with_published_location.category
+    _content(user_client)
+    category.title = "Переименованная категория"
+    category.save()
+    assert "Переименованная категория" in _content(user_client)
@@ -0,0 +1,149 @@
+import pstats
+import sys
+import time
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from core import profiling
+from core.profiling import (
+    OTHER_STACK, StackSampler, collapse_stack, make_profile_token,
+    stack_key, start_sampling_profiler, stop_sampling_profiler,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    with override_settings(PROFILING_DIR=tmp_path, PROFILING_KEEP=2):
+        yield tmp_path
+
+
+def test_staff_request_is_profiled(admin_client, admin_user, profile_dir):
+    token = make_profile_token(admin_user)
+    response = admin_client.get("/", {"__profile": token})
+    assert response.status_code == HTTPStatus.OK
+    name = response["X-Profile"]
+    assert "blog-index" in name
+    stats = pstats.Stats(str(profile_dir / f"{name}.prof"))
+    assert stats.total_calls > 0, (
+        "Убедитесь, что запрос сотрудника с токеном выполняется под"
+        " cProfile и профиль сохраняется в PROFILING_DIR."
+    )
+    collapsed = (profile_dir / f"{name}.collapsed").read_text()
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+    response = admin_client.get("/", HTTP_X_PROFILE=token)
+    assert "X-Profile" in response
+
+
+def test_profiles_are_pruned(admin_client, admin_user, profile_dir):
+    token = make_profile_token(admin_user)
+    for _ in range(3):
+        admin_client.get("/", {"__profile": token})
+    assert len(list(profile_dir.glob("*.prof"))) == 2
+    assert len(list(profile_dir.glob("*.collapsed"))) == 2
+
+
+@pytest.mark.parametrize("token_for", ["user", "admin", "bad"])
+def test_profiling_needs_own_staff_token(
+        user_client, user, admin_user, profile_dir, token_for
+):
+    token = {
+        "user": lambda: make_profile_token(user),
+        "admin": lambda: make_profile_token(admin_user),
+        "bad": lambda: make_profile_token(user) + "x",
+    }[token_for]()
+    response = user_client.get("/", {"__profile": token})
+    assert response.status_code == HTTPStatus.OK
+    assert "X-Profile" not in response
+    assert not list(profile_dir.iterdir()), (
+        "Убедитесь, что профилировать запросы могут только сотрудники со"
+        " своим токеном."
+    )
+
+
+def test_profile_pages_are_staff_only(
+        admin_client, admin_user, user_client, profile_dir
+):
+    name = admin_client.get(
+        "/", {"__profile": make_profile_token(admin_user)}
+    )["X-Profile"]
+    response = admin_client.get("/__perf__/profiles/")
+    assert response.status_code == HTTPStatus.OK
+    assert name in response.content.decode("utf-8")
+    response = admin_client.get(f"/__perf__/profiles/{name}.prof")
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content)
+    for url in ("/__perf__/profiles/", f"/__perf__/profiles/{name}.prof"):
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    for filename in ("..%2Fdb.sqlite3", "missing.prof", f"{name}.txt"):
+        response = admin_client.get(f"/__perf__/profiles/{filename}")
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.fixture
+def sampling_profiler():
+    with override_settings(SAMPLING_PROFILER_INTERVAL=0.001):
+        sampler = start_sampling_profiler()
+    yield sampler
+    stop_sampling_profiler()
+
+
+def test_sampling_profiler_samples_request_threads(
+        admin_client, sampling_profiler
+):
+    time.sleep(0.05)
+    assert not sampling_profiler.snapshot(), (
+        "Убедитесь, что фоновый профайлер снимает стеки только потоков,"
+        " занятых запросом."
+    )
+    for _ in range(50):
+        admin_client.get("/")
+        if sampling_profiler.snapshot():
+            break
+    response = admin_client.get("/__perf__/samples/")
+    assert response.status_code == HTTPStatus.OK
+    lines = response.content.decode("utf-8").splitlines()
+    assert any("ProfilingMiddleware" in line for line in lines)
+    response = admin_client.post("/__perf__/samples/")
+    assert response.status_code == HTTPStatus.FOUND
+    assert not sampling_profiler.snapshot()
+
+
+def test_sampled_stacks_are_capped():
+    sampler = StackSampler(1, max_stacks=2)
+    for stack in ("a", "b", "c", "a", "d"):
+        sampler.add(stack)
+    assert sampler.stacks == {"a": 2, "b": 1, OTHER_STACK: 2}
+
+
+def test_frame_names_are_bounded(settings):
+    settings.SAMPLING_PROFILER_MAX_FRAME_NAMES = 2
+
+    def inner():
+        return stack_key(sys._getframe())
+
+    def outer():
+        return inner()
+
+    key = outer()
+    assert len(profiling._frame_names) == 2, (
+        "Убедитесь, что кеш имён кадров не растёт сверх предела."
+    )
+    assert collapse_stack(key).endswith(
+        "test_frame_names_are_bounded.<locals>.outer;"
+        "test_profiling.test_frame_names_are_bounded.<locals>.inner"
+    ), "Убедитесь, что стек читается и после вытеснения имён из кеша."
+
+
+def test_sampled_stacks_page(admin_client, user_client):
+    assert admin_client.get("/__perf__/samples/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert user_client.get("/__perf__/samples/").status_code == (
+        HTTPStatus.FORBIDDEN
+    )
@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [q["sql"] for q in queries.captured_queries]
+
+
+def _post_queries(queries):
+    return [sql for sql in queries if 'FROM "blog_post"' in sql]
+
+
+@pytest.mark.parametrize("client_name", ["user_client", "another_user_client"])
+def test_post_detail_single_post_query(
+        request, client_name, post_with_published_location, comment_to_a_post
+):
+    client = request.getfixturevalue(client_name)
+    url = f"/posts/{post_with_published_location.id}/"
+    response, queries = _get_queries(client, url)
+    assert response.status_code == HTTPStatus.OK
+    post_queries = _post_queries(queries)
+    assert len(post_queries) == 1, (
+        "Убедитесь, что пост вместе с автором, категорией и местоположением"
+        " загружается одним запросом."
+    )
+    for table in ("blog_category", "blog_location", "auth_user"):
+        assert table in post_queries[0]
+    # сессия и пользователь, пост, комментарии с авторами
+    assert len(queries) == 4
+
+
+def test_post_detail_anonymous_queries(
+        unlogged_client, post_with_published_location, comment_to_a_post
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response, queries = _get_queries(unlogged_client, url)
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == 2
+
+
+def test_post_detail_hidden_from_others(
+        user_client, another_user_client, unlogged_client,
+        unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    url = f"/posts/{post.id}/"
+    assert user_client.get(url).status_code == HTTPStatus.OK
+    for client in (another_user_client, unlogged_client):
+        response, queries = _get_queries(client, url)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert len(_post_queries(queries)) == 1
+
+
+def _table_queries(queries, table):
+    return [
+        sql for sql in queries
+        if sql.startswith("SELECT") and f'FROM "{table}"' in sql
+    ]
+
+
+@pytest.mark.parametrize("client_name, user_queries, total", [
+    # сессия, пользователь (он же автор), число постов, ближайшая
+    # отложенная публикация, страница постов
+    ("user_client", 1, 5),
+    # сессия, пользователь, автор, число постов, ближайшая отложенная
+    # публикация, страница постов
+    ("another_user_client", 2, 6),
+    # автор, число постов, ближайшая отложенная публикация, страница постов
+    ("unlogged_client", 1, 4),
+])
+def test_profile_fetches_author_once(
+        request, client_name, user_queries, total, user,
+        many_posts_with_published_locations
+):
+    client = request.getfixturevalue(client_name)
+    response, queries = _get_queries(client, f"/profile/{user.username}/")
+    assert response.status_code == HTTPStatus.OK
+    assert len(_table_queries(queries, "auth_user")) == user_queries, (
+        "Убедитесь, что автор профиля загружается не больше одного раза"
+        " за запрос."
+    )
+    assert len(queries) == total
+
+
+def test_category_fetches_category_once(
+        user_client, published_category, many_posts_with_published_locations
+):
+    url = f"/category/{published_category.slug}/"
+    response, queries = _get_queries(user_client, url)
+    assert response.status_code == HTTPStatus.OK
+    assert len(_table_queries(queries, "blog_category")) == 1
+    # сессия, пользователь, категория, число постов, ближайшая отложенная
+    # публикация, страница постов
+    assert len(queries) == 6
+
+
+def test_edit_post_fetches_post_once(user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/edit/"
+    response, queries = _get_queries(user_client, url)
+    assert response.status_code == HTTPStatus.OK
+    assert len(_table_queries(queries, "blog_post")) == 1, (
+        "Убедитесь, что пост загружается один раз и для проверки автора,"
+        " и для формы."
+    )
+
+
+def test_delete_comment_fetches_comment_once(user_client, mixer, user,
+                                             post_with_published_location):
+    comment = mixer.blend(
+        "blog.Comment", author=user, post=post_with_published_location
+    )
+    url = (
+        f"/posts/{post_with_published_location.id}/comment/"
+        f"delete_comment/{comment.id}/"
+    )
+    response, queries = _get_queries(user_client, url)
+    assert response.status_code == HTTPStatus.OK
+    assert len(_table_queries(queries, "blog_comment")) == 1
+    assert not _table_queries(queries, "auth_user")[1:]
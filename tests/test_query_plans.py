@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _post_page_query(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    page_queries = [
+        query["sql"] for query in queries.captured_queries
+        if 'FROM "blog_post"' in query["sql"] and "LIMIT" in query["sql"]
+    ]
+    assert len(page_queries) == 1
+    return page_queries[0]
+
+
+def _query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN для SQLite"
+)
+@pytest.mark.parametrize(
+    "url, index",
+    [
+        ("/", "post_published_pub_date_idx"),
+        ("/category/{slug}/", "post_category_pub_date_idx"),
+        ("/profile/{user}/", "post_author_pub_date_idx"),
+    ],
+)
+@pytest.mark.parametrize("use_cursor", [False, True])
+def test_list_view_uses_index(
+        user_client, another_user_client, user, published_category,
+        many_posts_with_published_locations, url, index, use_cursor
+):
+    url = url.format(slug=published_category.slug, user=user.username)
+    for client in (user_client, another_user_client):
+        params = {}
+        if use_cursor:
+            page = client.get(url).context["page_obj"]
+            params = {"cursor": page.next_cursor}
+        plan = _query_plan(_post_page_query(client, url, params))
+        post_steps = [step for step in plan if "blog_post" in step]
+        assert post_steps and all(index in s for s in post_steps), (
+            f"Убедитесь, что выборка публикаций идёт по индексу `{index}`:"
+            f" {plan}"
+        )
+        assert not any("TEMP B-TREE" in step for step in plan), (
+            f"Убедитесь, что выборка публикаций не сортируется заново: {plan}"
+        )
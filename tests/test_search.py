@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.const import PAGINATE_BY
+from blog.models import Post
+from core.services import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _found(text, queryset=None):
+    return list(search_posts(
+        Post.objects.all() if queryset is None else queryset, text
+    ))
+
+
+def test_search_ranks_by_relevance(make_post):
+    other = make_post("Про котов", "Кошки и котята")
+    once = make_post("Прогулка", "Зимний лес у реки")
+    often = make_post("Лес", "Лес, лес и ещё раз лес")
+    assert _found("лес") == [often, once], (
+        "Убедитесь, что поиск находит посты по заголовку и тексту и"
+        " сортирует их по релевантности."
+    )
+    assert _found("ЛЕС реки") == [once]
+    assert _found("котята") == [other]
+
+
+def test_search_index_follows_changes(make_post):
+    post = make_post("Старый заголовок")
+    Post.objects.filter(pk=post.pk).update(title="Новый заголовок")
+    assert _found("старый") == []
+    assert _found("новый") == [post]
+    post.delete()
+    assert _found("новый") == [], (
+        "Убедитесь, что индекс поиска обновляется при изменении и удалении"
+        " постов."
+    )
+
+
+@pytest.mark.parametrize(
+    "text", ['"', "лес OR", "NEAR(лес", "*", "лес -кот", "   "]
+)
+def test_search_ignores_query_syntax(make_post, text):
+    make_post("Лес")
+    _found(text)
+
+
+def test_search_view_hides_unpublished(
+        user_client, make_post, mixer
+):
+    visible = make_post("Видимый лес")
+    make_post("Черновик лес", is_published=False)
+    make_post("Будущий лес", pub_date=timezone.now() + timedelta(days=1))
+    make_post(
+        "Скрытая категория лес",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    response = user_client.get("/search/", {"q": "лес"})
+    assert list(response.context["page_obj"]) == [visible], (
+        "Убедитесь, что поиск показывает только опубликованные посты."
+    )
+
+
+def test_search_view_paginates(unlogged_client, make_post):
+    for i in range(PAGINATE_BY + 1):
+        make_post(f"Лес {i}")
+    response = unlogged_client.get("/search/", {"q": "лес"})
+    assert len(response.context["page_obj"]) == PAGINATE_BY
+    assert 'href="?q=%D0%BB%D0%B5%D1%81&amp;page=2"' in (
+        response.content.decode("utf-8")
+    ), "Убедитесь, что ссылки пагинатора сохраняют поисковый запрос."
+    response = unlogged_client.get("/search/", {"q": "лес", "page": 2})
+    assert len(response.context["page_obj"]) == 1
+
+
+def test_search_uses_fts_index(make_post):
+    make_post("Лес")
+    queryset = search_posts(Post.objects.all(), "лес")
+    with connection.cursor() as cursor:
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+    assert "VIRTUAL TABLE INDEX" in plan
+    assert "SCAN blog_post" not in plan.replace("blog_post_fts", "")
+
+
+def test_admin_search_uses_fts_index(admin_client, make_post):
+    make_post("Лес")
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get("/admin/blog/post/", {"q": "лес"})
+    assert response.status_code == 200
+    assert response.context["cl"].result_count == 1
+    sql = " ".join(q["sql"] for q in queries.captured_queries)
+    assert "MATCH" in sql
+    assert "LIKE" not in sql, (
+        "Убедитесь, что поиск постов в админке идёт по полнотекстовому"
+        " индексу."
+    )
+
+
+def test_admin_autocomplete_matches_prefix(admin_client, make_post):
+    post = make_post("Прогулка в лесу")
+    make_post("Город")
+    response = admin_client.get("/admin/autocomplete/", {
+        "term": "прогулка в ле",
+        "app_label": "blog",
+        "model_name": "comment",
+        "field_name": "post",
+    })
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [
+        str(post.pk)
+    ], (
+        "Убедитесь, что автодополнение поста в админке находит его по"
+        " недописанному слову."
+    )
+    assert _found("прогулка в ле") == [], (
+        "Убедитесь, что обычный поиск ищет слова целиком."
+    )
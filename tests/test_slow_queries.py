@@ -0,0 +1,103 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+
+from core import slow_queries
+from core.metrics import QueryCounter
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def slow_log(tmp_path, monkeypatch):
+    path = tmp_path / "slow.log"
+    handler = logging.FileHandler(path, encoding="utf-8")
+    monkeypatch.setattr(slow_queries.logger, "handlers", [handler])
+    with override_settings(SLOW_QUERY_LOG_FILE=path):
+        yield path
+    handler.close()
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+def test_slow_queries_are_logged_with_plan(
+        user_client, post_with_published_location, slow_log
+):
+    user_client.get("/")
+    records = slow_queries.recent_slow_queries(100)
+    posts = [r for r in records if 'FROM "blog_post"' in r["sql"]]
+    assert posts, (
+        "Убедитесь, что запросы дольше SLOW_QUERY_THRESHOLD попадают в"
+        " журнал медленных запросов."
+    )
+    record = posts[0]
+    assert record["view"] == "blog:index"
+    assert record["plan"] and any("blog_post" in line for line in record["plan"])
+    # Запросы, выполненные при рендере шаблона, кадров blog/ и core/
+    # могут не иметь.
+    assert any(
+        r["origin"] and r["origin"][0].startswith(("blog/", "core/"))
+        for r in posts
+    )
+    assert record["params"] is not None
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+def test_slow_queries_are_logged_on_every_request(
+        post_with_published_location, slow_log
+):
+    # Тестовая БД в памяти не переподключается; имитируем соединение,
+    # открытое под обёрткой другого инструмента посреди запроса.
+    with connection.execute_wrapper(QueryCounter()):
+        connection_created.send(
+            sender=connection.__class__, connection=connection
+        )
+    handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(PATH_INFO="/")
+    logged = []
+    for _ in range(3):
+        before = len(slow_queries.recent_slow_queries(1000))
+        handler(dict(environ), lambda status, headers: None)
+        logged.append(len(slow_queries.recent_slow_queries(1000)) - before)
+        assert not connection.execute_wrappers, (
+            "Убедитесь, что обёртки соединения снимаются после запроса."
+        )
+    assert all(logged), (
+        "Убедитесь, что медленные запросы пишутся в журнал в каждом"
+        " запросе, а не только в первом."
+    )
+
+
+def test_fast_queries_are_not_logged(
+        user_client, post_with_published_location, slow_log
+):
+    user_client.get("/")
+    assert not slow_log.exists() or not slow_log.read_text()
+
+
+def test_tail_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(slow_queries, "READ_BLOCK", 7)
+    path = tmp_path / "log"
+    path.write_text("".join(f"строка {i}\n" for i in range(50)))
+    assert slow_queries.tail_lines(path, 3) == [
+        "строка 47", "строка 48", "строка 49"
+    ]
+    assert len(slow_queries.tail_lines(path, 100)) == 50
+    assert slow_queries.tail_lines(tmp_path / "missing", 3) == []
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+def test_slow_query_page_is_staff_only(
+        admin_client, user_client, post_with_published_location, slow_log
+):
+    user_client.get("/")
+    with override_settings(SLOW_QUERY_THRESHOLD=None):
+        response = admin_client.get("/__perf__/slow-queries/")
+        assert response.status_code == HTTPStatus.OK
+        assert "blog:index" in response.content.decode("utf-8")
+        response = user_client.get("/__perf__/slow-queries/")
+        assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,15 @@
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+
+
+def test_warm_templates_compiles_every_template():
+    templates_dir = Path(settings.TEMPLATES[0]["DIRS"][0])
+    expected = len(list(templates_dir.rglob("*.html")))
+    out = StringIO()
+    call_command("warm_templates", stdout=out)
+    assert f"Скомпилировано шаблонов: {expected}" in out.getvalue(), (
+        "Убедитесь, что прогрев компилирует все шаблоны из templates/."
+    )